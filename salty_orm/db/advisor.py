@@ -0,0 +1,214 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2018 Robert Abram - All Rights Reserved.
+#
+#
+# Opt-in index advisor. Records the columns each query filters, groups and sorts
+# by, then compares them with the existing table indexes.
+#
+
+import re
+import threading
+
+from salty_orm.db.base_provider import BaseDBConnection
+
+# Where clause operators an index can look up directly, and operators an index can read a range for.
+EQUALITY_OPERATORS = ('=', '==', 'IN', 'IS', 'IS NULL')
+RANGE_OPERATORS = ('>', '<', '>=', '<=', '!<', '!>', 'BETWEEN', 'LIKE', 'GLOB')
+
+_COLUMN_NAME = re.compile(r'^[`"]?([A-Za-z_][A-Za-z0-9_]*)[`"]?(?:\s+(?:ASC|DESC))?$', re.IGNORECASE)
+
+
+def where_columns(where) -> (list, list):
+    """
+    Return the equality and range column names of the ANDed clauses of a where clause. Columns in
+    OR and negated branches are left out, a single index can not serve them.
+    :param where: Q object or None.
+    :return: equality column list, range column list
+    """
+    equality = list()
+    ranges = list()
+
+    if where is None:
+        return equality, ranges
+
+    clauses = [where]
+    if where.is_branch():
+        if where.invert or where.connector.value != 'AND':
+            return equality, ranges
+        clauses = where.children
+
+    for clause in clauses:
+        if clause.is_branch() or clause.invert:
+            continue
+        if clause.operator.value in EQUALITY_OPERATORS and clause.field not in equality:
+            equality.append(clause.field)
+        elif clause.operator.value in RANGE_OPERATORS and clause.field not in ranges:
+            ranges.append(clause.field)
+
+    return equality, ranges
+
+
+def column_names(terms) -> list:
+    """
+    Return the plain column names of ORDER BY or GROUP BY terms, expressions are left out.
+    """
+    names = list()
+
+    for term in terms or list():
+        match = _COLUMN_NAME.match(str(term).strip())
+        if match and match.group(1) not in names:
+            names.append(match.group(1))
+
+    return names
+
+
+def suggest_columns(equality: list, ranges: list, group_by: list, order_by: list) -> tuple:
+    """
+    Return the index columns for a query: the equality columns, then the grouping or sorting columns,
+    then the first range column.
+    """
+    columns = list(equality)
+
+    for name in (group_by or order_by) + ranges[:1]:
+        if name not in columns:
+            columns.append(name)
+
+    return tuple(columns)
+
+
+class IndexSuggestion(object):
+    """
+    A missing index and the recorded queries it would serve.
+    """
+
+    db_table = None  # type: str
+    columns = None  # type: tuple
+    equality = 0  # type: int  # Number of leading equality columns, their order does not matter
+    count = 0  # type: int
+    total_time = 0.0  # type: float
+    max_time = 0.0  # type: float
+    sql = None  # type: str
+
+    def __init__(self, db_table: str, columns: tuple, equality: int = 0):
+        self.db_table = db_table
+        self.columns = columns
+        self.equality = equality
+
+    def served_by(self, index_columns) -> bool:
+        """
+        Return True if an index with the given columns serves the queries of this suggestion.
+        :param index_columns: Ordered index column names.
+        """
+        index_columns = tuple(index_columns)
+        size = len(self.columns)
+
+        return set(index_columns[:self.equality]) == set(self.columns[:self.equality]) and \
+            index_columns[self.equality:size] == self.columns[self.equality:]
+
+    @property
+    def avg_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    @property
+    def ddl(self) -> str:
+        """ Return the CREATE INDEX statement for this index """
+        return 'CREATE INDEX idx_{0}_{1} ON {0} ({2})'.format(
+                    self.db_table, '_'.join(self.columns), ', '.join(self.columns))
+
+    def __repr__(self):
+        return '<IndexSuggestion {0} count={1} total_time={2:.4f}>'.format(self.ddl, self.count, self.total_time)
+
+
+class IndexAdvisor(object):
+    """
+    Records the filter, group by and order by columns of the queries run while enabled, and reports
+    the indexes the tables are missing for them. The advisor is disabled by default.
+    """
+
+    enabled = False  # type: bool
+
+    _usage = None  # type: dict
+    _lock = None  # type: threading.Lock
+
+    def __init__(self):
+        self._usage = dict()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        """ Forget the recorded queries """
+        with self._lock:
+            self._usage.clear()
+
+    def record(self, db_conn: BaseDBConnection, db_table: str, where=None, group_by=None, order_by=None,
+               elapsed: float = 0.0, sql: str = None):
+        """
+        Record the columns a query used.
+        :param db_conn: Database connection the query ran on.
+        :param db_table: Database table name.
+        :param where: Optimized where clause Q object.
+        :param group_by: GROUP BY terms.
+        :param order_by: ORDER BY terms.
+        :param elapsed: Seconds the query took.
+        :param sql: Query statement.
+        """
+        if not self.enabled:
+            return
+
+        equality, ranges = where_columns(where)
+        columns = suggest_columns(equality, ranges, column_names(group_by), column_names(order_by))
+        if not columns:
+            return
+
+        key = (db_conn.db_identity(), db_table, columns)
+
+        with self._lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                usage = self._usage[key] = IndexSuggestion(db_table, columns, len(equality))
+            usage.count += 1
+            usage.total_time += elapsed
+            usage.max_time = max(usage.max_time, elapsed)
+            usage.sql = sql
+
+    def report(self, db_conn: BaseDBConnection) -> list:
+        """
+        Return the missing indexes for the queries recorded on a database, ranked by the total time of
+        the queries they would serve. An existing index serves a query when its leading columns are the
+        suggested columns, in any order for the equality columns.
+        :param db_conn: Database connection object.
+        :return: list of IndexSuggestion objects
+        """
+        identity = db_conn.db_identity()
+        indexes = dict()
+        missing = list()
+
+        with self._lock:
+            usages = [usage for key, usage in self._usage.items() if key[0] == identity]
+
+        for usage in usages:
+            if usage.db_table not in indexes:
+                table_indexes = db_conn.db_get_table_indexes(usage.db_table)
+                indexes[usage.db_table] = list(table_indexes.values())
+
+            if any(usage.served_by(cols) for cols in indexes[usage.db_table]):
+                continue
+
+            missing.append(usage)
+
+        return sorted(missing, key=lambda usage: (usage.total_time, usage.count), reverse=True)
+
+    def __len__(self):
+        return len(self._usage)
+
+
+# Shared index advisor used by all queries.
+index_advisor = IndexAdvisor()
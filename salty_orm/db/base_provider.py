@@ -4,6 +4,8 @@
 #
 # Copyright (c) 2018 Robert Abram - All Rights Reserved.
 #
+import itertools
+from collections import OrderedDict
 from typing import Union
 
 
@@ -35,14 +37,90 @@ class ExecStatementFailedError(ConnectionError):
     pass
 
 
+def fetch_chunks(cursor, chunk_size: int):
+    """
+    Yield the rows of an executed cursor, fetching chunk_size rows at a time, then close the cursor.
+    :param cursor: Database cursor object.
+    :param chunk_size: number of rows to fetch at a time.
+    :return: generator of row tuples
+    """
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+# Unique suffixes for temporary value table names.
+_value_table_ids = itertools.count(1)
+
+
+class StatementCache(object):
+    """
+    A LRU list of the statement texts a database driver keeps prepared, IE: the sqlite statement
+    cache. The driver reuses the prepared statements, this cache keeps the hit rate statistics.
+    """
+
+    maxsize = 128  # type: int
+    hits = 0  # type: int
+    misses = 0  # type: int
+
+    _cache = None  # type: OrderedDict
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+
+    def prepare(self, stmt: str) -> str:
+        """
+        Count a statement as a hit if the driver still has it prepared, otherwise as a miss.
+        :param stmt: database statement
+        :return: the statement
+        """
+        if stmt in self._cache:
+            self._cache.move_to_end(stmt)
+            self.hits += 1
+            return stmt
+
+        self.misses += 1
+
+        self._cache[stmt] = None
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+        return stmt
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """ Return the cache statistics """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+
 class BaseDBConnection(object):
     """
     Base Connection Object
     """
     _handle = None  # Sqlite3 connection handle
     _connected = False  # Are we connected to the database
+    _identity = None  # Identifies the database this connection points to, set when connecting
+    _cursor = None  # Cursor reused for statements that fetch all their rows at once
+    _statements = None  # type: StatementCache  # Set by providers that reuse prepared statements
     provider = None  # Database provider name
     placeholder = '?'  # statement argument placeholder
+    max_in_values = 500  # IN clauses with more values select them from a temporary value table
+    case_bulk_update = False  # bulk_update() uses one UPDATE ... CASE statement per batch instead of executemany
 
     testing = False  # unit testing flag.
 
@@ -59,6 +137,16 @@ class BaseDBConnection(object):
         # return self._name
         return type(self).__name__
 
+    def db_identity(self) -> str:
+        """
+        Return a string identifying the database this connection points to. Connections to the
+        same database return the same identity, so they can share cached table schemas.
+        :return: identity string
+        """
+        if self._identity:
+            return self._identity
+        return '{0}:{1}'.format(self.provider, id(self))
+
     def db_connect(self, alt_db_path: str = None) -> bool:
 
         raise NotImplementedError()
@@ -69,6 +157,34 @@ class BaseDBConnection(object):
         """
         self._connected = False
         self._handle = None
+        self._cursor = None
+
+    def _get_cursor(self):
+        """
+        Return the reusable cursor, creating it the first time.
+        """
+        if self._cursor is None:
+            self._cursor = self._handle.cursor()
+        return self._cursor
+
+    def _prepare_stmt(self, stmt: str):
+        """
+        Return the statement to pass to the driver, counting it in the statement cache if the provider
+        reuses prepared statements.
+        :param stmt: database statement
+        """
+        if self._statements is None:
+            return stmt
+        return self._statements.prepare(stmt)
+
+    def db_statement_stats(self) -> dict:
+        """
+        Return the statement cache statistics, IE: hits, misses and hit_rate.
+        :return: dict, or None if the provider does not reuse prepared statements
+        """
+        if self._statements is None:
+            return None
+        return self._statements.stats()
 
     def db_connected(self) -> bool:
         """
@@ -92,7 +208,7 @@ class BaseDBConnection(object):
 
         raise NotImplementedError()
 
-    def db_exec(self, sql: str, args: dict=None) -> bool:
+    def db_exec(self, sql: str, args: dict=None, commit: bool = True) -> bool:
 
         raise NotImplementedError()
 
@@ -102,6 +218,12 @@ class BaseDBConnection(object):
         """
         raise NotImplementedError()
 
+    def db_rollback(self) -> bool:
+        """
+        Call database rollback
+        """
+        raise NotImplementedError()
+
     def db_exec_stmt(self, stmt: str, args: dict=None) -> dict:
         """
         Execute a database statement
@@ -111,9 +233,66 @@ class BaseDBConnection(object):
         """
         raise NotImplementedError()
 
+    def db_exec_stmt_rows(self, stmt: str, args: dict=None, chunk_size: int=None) -> (tuple, list):
+        """
+        Execute a database statement and return the column names and the row tuples
+        :param stmt: database statement
+        :param args: argument dict
+        :param chunk_size: if set, return a generator that fetches chunk_size rows at a time instead of a list
+        :return: column name tuple, rows
+        """
+        raise NotImplementedError()
+
     def db_exec_select_by_id_all(self, table: str, pk: int) -> dict:
         raise NotImplementedError()
 
+    def db_exec_many(self, stmt: str, args_list: list, commit: bool = True) -> int:
+        """
+        Execute a database statement once for each argument list and commit
+        :param stmt: database statement
+        :param args_list: list of argument lists
+        :param commit: commit after the statements, otherwise the caller commits or rolls back
+        :return: number of rows changed
+        """
+        raise NotImplementedError()
+
+    def db_last_insert_ids(self, count: int) -> list:
+        """
+        Return the primary keys generated by the last count inserted rows, in insert order.
+        :param count: number of rows inserted by the last statement
+        :return: list of primary keys, or None if the provider can not return them
+        """
+        return None
+
+    def _get_value_column_type(self, values: list) -> str:
+        """
+        Return the column type declaration of a value table holding the given values.
+        """
+        return ''
+
+    def db_create_value_table(self, values: list) -> str:
+        """
+        Create a temporary table with a single 'value' column holding the given values. Nothing is
+        committed, value tables are used by read only statements.
+        :param values: list of values
+        :return: table name
+        """
+        name = '_salty_values_{0}'.format(next(_value_table_ids))
+
+        self.db_exec('CREATE TEMPORARY TABLE {0} (value {1})'.format(name, self._get_value_column_type(values)),
+                     commit=False)
+        self.db_exec_many('INSERT INTO {0} (value) VALUES ({1})'.format(name, self.placeholder),
+                          [(value,) for value in values], commit=False)
+
+        return name
+
+    def db_drop_value_table(self, name: str):
+        """
+        Drop a temporary table created by db_create_value_table
+        :param name: table name
+        """
+        self.db_exec('DROP TABLE IF EXISTS {0}'.format(name), commit=False)
+
     def db_exec_commit(self, stmt: str, args: dict=None) -> int:
         """
         Execute database statement and commit
@@ -124,6 +303,30 @@ class BaseDBConnection(object):
         """ return the record count of a table """
         raise NotImplementedError()
 
+    def db_get_table_spec(self, table: str) -> list:
+        """ return an ordered list of salty_orm.db.schema.Column objects describing a table """
+        raise NotImplementedError()
+
+    def db_get_table_indexes(self, table: str) -> dict:
+        """ return a dict of index name to the ordered column names of each index of a table """
+        raise NotImplementedError()
+
+    def db_get_schema_fingerprint(self) -> dict:
+        """
+        Return a dict of table name to schema fingerprint. A database wide fingerprint may be returned
+        with the None key instead. Fingerprints change when a table definition changes.
+        """
+        raise NotImplementedError()
+
+    def db_explain(self, stmt: str, args: dict=None):
+        """
+        Return the execution plan of a database statement
+        :param stmt: database statement
+        :param args: argument dict
+        :return: salty_orm.db.explain.QueryPlan object
+        """
+        raise NotImplementedError()
+
     def db_get_record_info(self, fields, table: str, pk: int) -> dict:
         """ get the id, created and modified fields of a table record """
         raise NotImplementedError()
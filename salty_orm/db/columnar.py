@@ -0,0 +1,149 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2018 Robert Abram - All Rights Reserved.
+#
+#
+# Column oriented query results. Numeric columns are stored in typed array.array
+# buffers, other columns in object lists.
+#
+
+from array import array
+from collections import OrderedDict
+from itertools import islice
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# array.array type codes and numpy dtypes by python type.
+ARRAY_TYPECODES = {
+    int: 'q',
+    float: 'd',
+}
+
+NUMPY_DTYPES = {
+    'q': 'int64',
+    'd': 'float64',
+}
+
+
+class ColumnarResult(object):
+    """
+    A query result stored by column instead of by row.
+    """
+
+    _columns = None  # type: OrderedDict
+    _rows = 0  # type: int
+
+    def __init__(self):
+        self._columns = OrderedDict()
+        self._rows = 0
+
+    @classmethod
+    def from_rows(cls, rows, types: dict = None, chunk_size: int = 2000) -> "ColumnarResult":
+        """
+        Build a columnar result from an iterable of row dicts, chunk_size rows at a time.
+        :param rows: Iterable of row dicts, all with the same keys.
+        :param types: Python types of the columns by column name, other columns are typed by their first value.
+        :param chunk_size: Number of rows to transpose into the columns at a time.
+        :return: ColumnarResult object
+        """
+        result = cls()
+        types = types or dict()
+        rows = iter(rows)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            if not result._columns:
+                for name in chunk[0].keys():
+                    py_type = types.get(name)
+                    if py_type is None:
+                        py_type = next((type(r[name]) for r in chunk if r[name] is not None), None)
+                    typecode = ARRAY_TYPECODES.get(py_type)
+                    result._columns[name] = array(typecode) if typecode else list()
+
+            for name, values in zip(list(result._columns.keys()), zip(*(r.values() for r in chunk))):
+                result._extend(name, values)
+
+            result._rows += len(chunk)
+
+        return result
+
+    def _extend(self, name: str, values):
+        """
+        Append values to a column. A typed column that receives a null or out of range value
+        falls back to an object list.
+        """
+        column = self._columns[name]
+
+        if isinstance(column, list):
+            column.extend(values)
+            return
+
+        size = len(column)
+        try:
+            column.extend(values)
+        except (TypeError, OverflowError):
+            self._columns[name] = column[:size].tolist() + list(values)
+
+    @property
+    def names(self) -> list:
+        """ Return the column names """
+        return list(self._columns.keys())
+
+    def is_typed(self, name: str) -> bool:
+        """ Return True if a column is stored in a typed array buffer """
+        return isinstance(self._columns[name], array)
+
+    def memoryview(self, name: str) -> memoryview:
+        """
+        Return a zero-copy memoryview over a typed column.
+        :param name: Column name.
+        """
+        column = self._columns[name]
+        if not isinstance(column, array):
+            raise TypeError("column '{0}' is not stored in a typed buffer.".format(name))
+        return memoryview(column)
+
+    def numpy(self, name: str):
+        """
+        Return a column as a numpy array. Typed columns share their buffer with the array.
+        :param name: Column name.
+        """
+        if numpy is None:
+            raise ImportError('numpy is not installed.')
+
+        column = self._columns[name]
+        if isinstance(column, array):
+            return numpy.frombuffer(column, dtype=NUMPY_DTYPES[column.typecode])
+        return numpy.array(column, dtype=object)
+
+    def to_dict(self) -> OrderedDict:
+        """ Return the columns by column name """
+        return OrderedDict(self._columns)
+
+    def items(self):
+        return self._columns.items()
+
+    def __getitem__(self, name: str):
+        return self._columns[name]
+
+    def __contains__(self, name: str):
+        return name in self._columns
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        """ Return the number of rows """
+        return self._rows
+
+    def __repr__(self):
+        return '<ColumnarResult {0} rows {1}>'.format(self._rows, self.names)
@@ -0,0 +1,222 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2018 Robert Abram - All Rights Reserved.
+#
+#
+# Provider neutral query plans. The sqlite EXPLAIN QUERY PLAN rows and the MySQL
+# EXPLAIN FORMAT=JSON document are parsed into the same tree of plan nodes.
+#
+
+import json
+import re
+
+# Sqlite plan detail patterns, IE: 'SCAN test_model' or 'SEARCH test_model USING INDEX idx_status (status=?)'.
+_SQLITE_ACCESS = re.compile(r'^(SCAN|SEARCH)\s+(?:TABLE\s+)?(\S+)(?:\s+AS\s+\S+)?(?:\s+USING\s+(.*))?$')
+_SQLITE_INDEX = re.compile(r'(?:COVERING\s+)?INDEX\s+(\S+)')
+
+# MySQL plan operations that wrap the table access nodes.
+_MYSQL_OPERATIONS = {
+    'ordering_operation': 'ORDER BY',
+    'grouping_operation': 'GROUP BY',
+    'duplicates_removal': 'DISTINCT',
+    'windowing': 'WINDOW',
+}
+
+
+class PlanNode(object):
+    """
+    A single step of a query plan.
+    """
+
+    detail = None  # type: str
+    table = None  # type: str
+    access = None  # type: str
+    index = None  # type: str
+
+    full_scan = False  # type: bool
+    temp_btree = False  # type: bool
+    filesort = False  # type: bool
+
+    children = None  # type: list
+
+    def __init__(self, detail: str, table: str = None, access: str = None, index: str = None):
+        """
+        :param detail: Plan step description from the database.
+        :param table: Table read by this step.
+        :param access: How the table is read, IE: 'scan', 'search' or the MySQL access type.
+        :param index: Index used to read the table.
+        """
+        self.detail = detail
+        self.table = table
+        self.access = access
+        self.index = index
+        self.children = list()
+
+    def walk(self):
+        """ Yield this node and all the nodes below it """
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self) -> dict:
+        return {
+            'detail': self.detail,
+            'table': self.table,
+            'access': self.access,
+            'index': self.index,
+            'full_scan': self.full_scan,
+            'temp_btree': self.temp_btree,
+            'filesort': self.filesort,
+            'children': [child.to_dict() for child in self.children],
+        }
+
+    def __repr__(self):
+        return '<PlanNode {0}>'.format(self.detail)
+
+
+class QueryPlan(object):
+    """
+    The parsed plan of a query. A full scan reads every row of a table, a temporary b-tree is built
+    to sort, group or remove duplicates, and a filesort sorts the rows outside of an index.
+    """
+
+    sql = None  # type: str
+    nodes = None  # type: list
+    raw = None  # Plan output as returned by the database
+
+    def __init__(self, sql: str, nodes: list, raw=None):
+        """
+        :param sql: Explained SQL statement.
+        :param nodes: Top level PlanNode objects.
+        :param raw: Plan output as returned by the database.
+        """
+        self.sql = sql
+        self.nodes = nodes
+        self.raw = raw
+
+    def walk(self):
+        """ Yield every node of the plan """
+        for node in self.nodes:
+            yield from node.walk()
+
+    @property
+    def full_scans(self) -> list:
+        """ Return the names of the tables that are fully scanned """
+        return [node.table for node in self.walk() if node.full_scan]
+
+    @property
+    def has_full_scan(self) -> bool:
+        return any(node.full_scan for node in self.walk())
+
+    @property
+    def has_temp_btree(self) -> bool:
+        return any(node.temp_btree for node in self.walk())
+
+    @property
+    def has_filesort(self) -> bool:
+        return any(node.filesort for node in self.walk())
+
+    def to_dict(self) -> dict:
+        return {'sql': self.sql, 'nodes': [node.to_dict() for node in self.nodes]}
+
+    def __str__(self):
+        lines = list()
+
+        def add(node, depth):
+            flags = [name for name in ('full_scan', 'temp_btree', 'filesort') if getattr(node, name)]
+            flags = ' [{0}]'.format(', '.join(flags)) if flags else ''
+            lines.append('{0}{1}{2}'.format('  ' * depth, node.detail, flags))
+            for child in node.children:
+                add(child, depth + 1)
+
+        for node in self.nodes:
+            add(node, 0)
+
+        return '\n'.join(lines)
+
+
+def parse_sqlite_plan(sql: str, rows) -> QueryPlan:
+    """
+    Parse the rows of a sqlite EXPLAIN QUERY PLAN statement.
+    :param sql: Explained SQL statement.
+    :param rows: Row tuples of (id, parent, notused, detail).
+    :return: QueryPlan object
+    """
+    nodes = dict()
+    roots = list()
+
+    for row in rows:
+        node_id, parent, detail = row[0], row[1], row[-1]
+        node = PlanNode(detail)
+
+        match = _SQLITE_ACCESS.match(detail)
+        if match:
+            node.access = match.group(1).lower()
+            node.table = match.group(2)
+            using = match.group(3) or ''
+            index = _SQLITE_INDEX.search(using)
+            if index:
+                node.index = index.group(1)
+            elif 'PRIMARY KEY' in using:
+                node.index = 'PRIMARY KEY'
+            node.full_scan = node.access == 'scan' and not using
+        elif 'TEMP B-TREE' in detail:
+            node.temp_btree = True
+
+        nodes[node_id] = node
+        if parent in nodes:
+            nodes[parent].children.append(node)
+        else:
+            roots.append(node)
+
+    return QueryPlan(sql, roots, list(rows))
+
+
+def parse_mysql_plan(sql: str, document) -> QueryPlan:
+    """
+    Parse the JSON document of a MySQL EXPLAIN FORMAT=JSON statement.
+    :param sql: Explained SQL statement.
+    :param document: JSON string or parsed dict.
+    :return: QueryPlan object
+    """
+    if isinstance(document, (str, bytes)):
+        document = json.loads(document)
+
+    root = PlanNode('QUERY')
+    _parse_mysql_block(document, root)
+
+    return QueryPlan(sql, root.children, document)
+
+
+def _parse_mysql_block(data: dict, parent: PlanNode):
+    """
+    Add the table accesses and operations of a MySQL plan block to a parent node.
+    """
+    for key, value in data.items():
+
+        if key == 'table' and isinstance(value, dict):
+            access = value.get('access_type')
+            node = PlanNode('{0} {1}'.format(access or 'ACCESS', value.get('table_name')),
+                            table=value.get('table_name'), access=access, index=value.get('key'))
+            node.full_scan = access == 'ALL'
+            node.temp_btree = bool(value.get('using_temporary_table'))
+            node.filesort = bool(value.get('using_filesort'))
+            parent.children.append(node)
+            _parse_mysql_block(value, node)
+
+        elif key in _MYSQL_OPERATIONS and isinstance(value, dict):
+            node = PlanNode(_MYSQL_OPERATIONS[key])
+            node.temp_btree = bool(value.get('using_temporary_table'))
+            node.filesort = bool(value.get('using_filesort'))
+            parent.children.append(node)
+            _parse_mysql_block(value, node)
+
+        elif isinstance(value, dict):
+            _parse_mysql_block(value, parent)
+
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    _parse_mysql_block(item, parent)
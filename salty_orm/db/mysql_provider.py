@@ -7,10 +7,15 @@
 
 import collections
 import MySQLdb as mysql
+import MySQLdb.cursors
 from typing import Union
 
 from salty_orm.db.sqlite3_provider import SqliteDBConnection as BaseDBConnection
-from salty_orm.db.base_provider import NotConnectedError, ExecStatementFailedError, InvalidStatementError
+from salty_orm.db import base_provider
+from salty_orm.db.base_provider import NotConnectedError, ExecStatementFailedError, InvalidStatementError, \
+    fetch_chunks
+from salty_orm.db.explain import QueryPlan, parse_mysql_plan
+from salty_orm.db.schema import Column, py_type_from_decl
 
 
 class MySQLDBConnection(BaseDBConnection):
@@ -18,6 +23,7 @@ class MySQLDBConnection(BaseDBConnection):
     provider = 'mysql'
     _buffered = False
     placeholder = '%s'  # statement argument placeholder
+    case_bulk_update = True  # MySQLdb runs an executemany UPDATE as one statement per row
 
     def db_connect(self, user=None, password=None, database=None, host=None, **kwargs) -> bool:
         """
@@ -31,11 +37,22 @@ class MySQLDBConnection(BaseDBConnection):
         """
         try:
             self._handle = mysql.connect(user=user, passwd=password, db=database, host=host, **kwargs)
+            self._identity = '{0}:{1}@{2}:{3}/{4}'.format(
+                                self.provider, user, host, kwargs.get('port', 3306), database)
+            self._cursor = None
             self._connected = True
             return True
         except Exception as e:
             raise NotConnectedError("Error: Connection attempt to database failed. \n{0}".format(e))
 
+    def _get_cursor(self):
+        """
+        Return the reusable cursor, creating it the first time.
+        """
+        if self._cursor is None:
+            self._cursor = self._handle.cursor()
+        return self._cursor
+
     def db_cursor(self):
         """
         Return a mysql connection cursor object
@@ -69,35 +86,21 @@ class MySQLDBConnection(BaseDBConnection):
 
             data = cursor.fetchall()
 
-            fields = list()
-
             if cursor.description is not None:
-
-                for x in range(len(cursor.description)):
-                    fields.append(cursor.description[x][0])
-
-                new_data = list()
-
-                for row in data:
-
-                    d = dict()
-                    for idx, col in enumerate(fields):
-                        d[col] = row[idx]
-
-                    new_data.append(d)
-
-                data = new_data
+                fields = tuple(col[0] for col in cursor.description)
+                data = [dict(zip(fields, row)) for row in data]
 
             cursor.close()
             return data
         except Exception as e:
             raise ExecStatementFailedError(e)
 
-    def db_exec(self, stmt: str, args: Union[dict, list] = None) -> bool:
+    def db_exec(self, stmt: str, args: Union[dict, list] = None, commit: bool = True) -> bool:
         """
         Execute a SQL Statement that returns no data.
         :param stmt: SQL Statement to execute.
         :param args: List or dictionary of parameterized arguments.
+        :param commit: Commit after the statement, otherwise the caller commits or rolls back.
         :return: True if successful, otherwise False.
         """
         if self.db_connected() is False:
@@ -108,10 +111,10 @@ class MySQLDBConnection(BaseDBConnection):
             args = args.values()
 
         try:
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, args)
-            cursor.close()
-            self._handle.commit()
+            cursor = self._get_cursor()
+            cursor.execute(self._prepare_stmt(stmt), args)
+            if commit:
+                self._handle.commit()
 
         except Exception as e:
             raise ExecStatementFailedError(e)
@@ -123,7 +126,25 @@ class MySQLDBConnection(BaseDBConnection):
         Execute a statement that returns data.
         :param stmt: SQL statement
         :param args: List or dictionary of parameterized arguments.
-        :return: cursor or none
+        :return: list of row dicts
+        """
+        columns, rows = self.db_exec_stmt_rows(stmt, args)
+
+        if not columns:
+            return rows
+
+        # The column names are looked up once per statement, not once per row.
+        return [dict(zip(columns, row)) for row in rows]
+
+    def db_exec_stmt_rows(self, stmt: str, args: Union[dict, list] = None, chunk_size: int = None) -> (tuple, list):
+        """
+        Execute a statement and return the column names and the row tuples. When chunk_size is set
+        the rows are read with an unbuffered server side cursor, and the connection can not run other
+        statements until all the rows have been read or the generator is closed.
+        :param stmt: SQL statement
+        :param args: List or dictionary of parameterized arguments.
+        :param chunk_size: if set, return a generator that fetches chunk_size rows at a time instead of a list
+        :return: column name tuple, rows
         """
         if self.db_connected() is False:
             raise NotConnectedError("not connected to a database")
@@ -133,40 +154,22 @@ class MySQLDBConnection(BaseDBConnection):
 
         # Convert dict to list
         if args and isinstance(args, collections.abc.Mapping):
-            args = args.values()
+            args = list(args.values())
 
         try:
 
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, args)
-
-            data = cursor.fetchall()
-
-            fields = list()
-
-            if cursor.description is not None:
-
-                for x in range(len(cursor.description)):
-                    fields.append(cursor.description[x][0])
-
-                new_data = list()
+            if chunk_size:
+                cursor = self._handle.cursor(MySQLdb.cursors.SSCursor)
+            else:
+                cursor = self._get_cursor()
+            cursor.execute(self._prepare_stmt(stmt), args)
 
-                for row in data:
+            columns = tuple(col[0] for col in cursor.description) if cursor.description else tuple()
 
-                    d = dict()
-                    for idx, col in enumerate(fields):
-                        d[col] = row[idx]
+            if chunk_size:
+                return columns, fetch_chunks(cursor, chunk_size)
 
-                    new_data.append(d)
-
-                data = new_data
-
-            cursor.close()
-
-            # TODO: If cursor.description is not None, convert row tuples to dict
-            # https://dev.mysql.com/doc/connector-python/en/connector-python-api-mysqlcursor-description.html
-
-            return data
+            return columns, cursor.fetchall()
 
         except Exception as e:
             raise ExecStatementFailedError(e)
@@ -191,17 +194,130 @@ class MySQLDBConnection(BaseDBConnection):
 
         try:
 
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, args)
+            cursor = self._get_cursor()
+            cursor.execute(self._prepare_stmt(stmt), args)
             lastrowid = cursor.lastrowid
             self._handle.commit()
-            cursor.close()
 
             return lastrowid if lastrowid else 1
 
         except Exception as e:
             raise ExecStatementFailedError(e)
 
+    def db_exec_many(self, stmt: str, args_list: list, commit: bool = True) -> int:
+        """
+        Execute a SQL statement once for each argument list and commit. MySQLdb sends INSERT
+        statements as a single multi row INSERT.
+        :param stmt: SQL statement
+        :param args_list: List of argument dictionaries or lists.
+        :param commit: Commit after the statements, otherwise the caller commits or rolls back.
+        :return: Number of rows changed.
+        """
+        if self.db_connected() is False:
+            raise NotConnectedError("not connected to a database")
+
+        if not stmt:
+            raise InvalidStatementError('sql statement is missing')
+
+        args_list = [list(args.values()) if isinstance(args, collections.abc.Mapping) else args
+                     for args in args_list]
+
+        try:
+            cursor = self._get_cursor()
+            rowcount = cursor.executemany(self._prepare_stmt(stmt), args_list)
+            if commit:
+                self._handle.commit()
+
+            return rowcount
+
+        except Exception as e:
+            raise ExecStatementFailedError(e)
+
+    def db_last_insert_ids(self, count: int) -> list:
+        """
+        Auto increment values of a multi row INSERT are only consecutive for some innodb_autoinc_lock_mode
+        settings, so the generated primary keys are not returned.
+        """
+        return None
+
+    def _get_value_column_type(self, values: list) -> str:
+        """
+        Return the column type declaration of a value table holding the given values.
+        """
+        if all(isinstance(v, int) for v in values):
+            return 'BIGINT'
+        if all(isinstance(v, (int, float)) for v in values):
+            return 'DOUBLE'
+        if all(isinstance(v, str) and len(v) <= 255 for v in values):
+            return 'VARCHAR(255)'
+        return 'TEXT'
+
+    def db_create_value_table(self, values: list) -> str:
+        """
+        Create a temporary table with a single 'value' column holding the given values. Creating a
+        temporary table does not end the current transaction, and nothing is committed.
+        :param values: list of values
+        :return: table name
+        """
+        return base_provider.BaseDBConnection.db_create_value_table(self, values)
+
+    def db_drop_value_table(self, name: str):
+        """
+        Drop a temporary table created by db_create_value_table
+        :param name: table name
+        """
+        self.db_exec('DROP TEMPORARY TABLE IF EXISTS {0}'.format(name), commit=False)
+
+    def db_explain(self, stmt: str, args: Union[dict, list] = None) -> QueryPlan:
+        """ return the parsed EXPLAIN FORMAT=JSON plan of a SQL statement """
+
+        columns, rows = self.db_exec_stmt_rows('EXPLAIN FORMAT=JSON {0}'.format(stmt), args)
+
+        return parse_mysql_plan(stmt, rows[0][0])
+
+    def db_get_table_spec(self, table: str) -> list:
+        """ return an ordered list of Column objects describing a table """
+
+        spec = list()
+        fields = list()
+        data = self.db_exec_stmt('SHOW COLUMNS FROM {0}'.format(table))
+
+        if data:
+            for row in data:
+                if row['Field'] not in fields:
+                    fields.append(row['Field'])
+                    spec.append(Column(row['Field'], py_type_from_decl(row['Type']), null=row['Null'] == 'YES',
+                                       primary_key=row['Key'] == 'PRI'))
+
+        return spec
+
+    def db_get_table_indexes(self, table: str) -> dict:
+        """ return a dict of index name to the ordered column names of each index of a table """
+
+        indexes = dict()
+        data = self.db_exec_stmt('SHOW INDEX FROM `{0}`'.format(table))
+
+        for row in sorted(data or list(), key=lambda row: (row['Key_name'], row['Seq_in_index'])):
+            indexes.setdefault(row['Key_name'], list()).append(row['Column_name'])
+
+        return indexes
+
+    def db_get_schema_fingerprint(self) -> dict:
+        """ return a checksum of each table definition in the current database """
+
+        sql = """SELECT c.TABLE_NAME AS table_name,
+                    CONCAT_WS(':', COUNT(1), SUM(CRC32(CONCAT_WS(':', c.ORDINAL_POSITION, c.COLUMN_NAME,
+                        c.COLUMN_TYPE, c.IS_NULLABLE, c.COLUMN_KEY))), MAX(t.CREATE_TIME)) AS fingerprint
+                 FROM information_schema.COLUMNS c
+                    JOIN information_schema.TABLES t
+                        ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+                 WHERE c.TABLE_SCHEMA = DATABASE()
+                 GROUP BY c.TABLE_NAME"""
+
+        data = self.db_exec_stmt(sql)
+
+        return {row['table_name']: row['fingerprint'] for row in data or list()}
+
     def db_commit(self) -> bool:
         return super(MySQLDBConnection, self).db_commit()
 
@@ -12,15 +12,21 @@
 #          to make sure those properties get set in the cloned objects.
 
 
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
 import json
 import datetime
+import keyword
+import threading
+import time
 from enum import Enum
 from typing import TypeVar, Union
+import weakref
 
-from dateutil.parser import parse as dateparse
-
+from salty_orm.db.advisor import index_advisor
 from salty_orm.db.base_provider import BaseDBConnection
+from salty_orm.db.columnar import ColumnarResult
+from salty_orm.db.explain import QueryPlan
+from salty_orm.db.schema import TableSchema, schema_registry
 
 
 REPR_OUTPUT_SIZE = 20
@@ -73,6 +79,74 @@ class ModelFieldRequired(ModelError):
     pass
 
 
+class ModelManager(object):
+    """
+    The model 'objects' manager. On a model class it returns the manager for that class, which is
+    bound to a database connection with using(). On a model object it returns the manager bound to
+    the object's database connection. Bound managers are created on demand, so they never keep a
+    database connection alive.
+
+        RulingModel.objects.using(dbconn).filter(status=1)
+    """
+
+    model = None  # type: type
+    db_conn = None  # type: BaseDBConnection
+
+    _managers = None  # type: dict
+
+    def __init__(self, model: type = None, db_conn: BaseDBConnection = None):
+        """
+        :param model: Model class, not set for the descriptor on BaseTableModel.
+        :param db_conn: Database connection object.
+        """
+        self.model = model
+        self.db_conn = db_conn
+        if model is None:
+            self._managers = dict()
+
+    def __get__(self, instance, owner) -> "ModelManager":
+        manager = self._managers.get(owner)
+        if manager is None:
+            manager = self._managers.setdefault(owner, self.__class__(owner))
+
+        if instance is None:
+            return manager
+        return manager.using(instance.db_conn)
+
+    def using(self, db_conn: BaseDBConnection) -> "ModelManager":
+        """
+        Return the manager for this model class bound to a database connection.
+        :param db_conn: Database connection object.
+        :return: ModelManager object
+        """
+        if self.model is None:
+            raise ModelRequired('manager is not attached to a model class')
+
+        return self.__class__(self.model, db_conn)
+
+    def get_queryset(self) -> "BaseQuerySet":
+        """
+        Return a new queryset for this model class and database connection.
+        :return: BaseQuerySet object
+        """
+        if self.model is None:
+            raise ModelRequired('manager is not attached to a model class')
+
+        return BaseQuerySet(self.db_conn, model=self.model)
+
+    def __getattr__(self, name):
+        # Pass queryset methods through, IE: objects.filter(...) or objects.get(...).
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get_queryset(), name)
+
+    def __iter__(self):
+        return iter(self.get_queryset())
+
+    def __len__(self):
+        return len(self.get_queryset())
+
+
 class BaseTableModel(object):
     """
     This Model object is used as a base for data retrieval and manipulation
@@ -84,9 +158,21 @@ class BaseTableModel(object):
     created = None  # type: datetime
     modified = None  # type: datetime
 
-    objects = None  # type: BaseQuerySet
+    objects = ModelManager()  # type: ModelManager
     fields = None  # type: list
 
+    # Column value converters from the table schema, shared by all instances.
+    _converters = dict()  # type: dict
+
+    # Lazy loaded models keep the raw row values and decode each field on first access.
+    _raw_row = None  # type: tuple
+    _lazy_fields = tuple()  # type: tuple
+
+    # Models loaded with only() or defer() read the deferred fields on first access.
+    _deferred_fields = tuple()  # type: tuple
+    _deferred_loader = None  # type: DeferredLoader
+    _base_model = None  # type: type
+
     def __init__(self, db_conn: BaseDBConnection, *args, **kwargs):
         """
         If parameter values in args, then the value is expected to be a dictionary from a json response
@@ -97,10 +183,11 @@ class BaseTableModel(object):
 
         self.db_conn = db_conn
         self.fields = list()
-        self.objects = BaseQuerySet(db_conn, model=self)
 
-        if db_conn is not None and not db_conn.testing:
-            self.fields = self._get_table_columns()
+        if (db_conn is not None and not db_conn.testing) or schema_registry.get_spec(self):
+            schema = self._get_table_schema()
+            self.fields = list(schema.columns)
+            self._converters = schema.converters
 
         if args is not None and len(args) is not 0 and args[0] is not None:
             # self._json_data = True
@@ -133,28 +220,31 @@ class BaseTableModel(object):
         if key not in self.fields:
             self.fields.append(key)
 
-        # check for datetime field
-        # TODO: Find a better way to test for datefield
-        if key == 'created' or key == 'modified' or key.endswith('_dt') or key.startswith('last_') \
-                or key.endswith('_start') or key.endswith('_from') or key.endswith('_from') \
-                or key.endswith('_to'):
-
-            try:
-                val = dateparse(value)
-                value = val
-            except Exception:
-                pass
+        # Convert the value using the declared column type, already typed values pass through.
+        converter = self._converters.get(key)
+        if converter is not None:
+            value = converter(value)
 
         self.__dict__[key] = value
 
         # print('{0} : {1}'.format(key, value))
 
+    def hydrate(self):
+        """
+        Decode all the lazily loaded field values now. Models loaded without lazy() are always hydrated.
+        """
+        if self._raw_row is None:
+            return
+
+        for field in self._lazy_fields:
+            if field not in self.__dict__:
+                getattr(self, field)
+
     def clone(self: BaseUtilityModel_T) -> BaseUtilityModel_T:
 
+        self.hydrate()
         clone = self.__class__(db_conn=self.db_conn)
-
-        clone.object = self.objects
-        clone.fields = self.fields
+        clone.fields = list(self.fields)
 
         for field in self.fields:
             if field in self.__dict__:
@@ -177,37 +267,26 @@ class BaseTableModel(object):
         :param cleaned: Leave out fields with null values
         :return: dict
         """
+        self.hydrate()
         data = OrderedDict()
         for field in self.fields:
             if cleaned is False or self.__dict__[field] is not None:
                 data[field] = self.__dict__[field]
         return data
 
-    def _get_table_columns(self) -> list:
+    def _get_table_schema(self) -> TableSchema:
         """
-        Query the field names from the table and return the column name list
-        # TODO: Move this code to each provider to get table field name list
+        Return the schema for this table. The table is only introspected the first time it is seen,
+        after that the schema comes from the shared schema registry. Models with a Meta.columns spec
+        are never introspected.
         """
+        return schema_registry.get_schema(self.db_conn, self)
 
-        fields = list()
-        sql = None
-
-        if self.db_conn.provider == 'sqlite3':
-            sql = 'PRAGMA table_info("{0}")'.format(self.Meta.db_table)
-        if self.db_conn.provider == 'mysql':
-            sql = 'SHOW COLUMNS FROM {0}'.format(self.Meta.db_table)
-
-        data = self.db_conn.db_exec_stmt(sql)
-
-        if data:
-            for row in data:
-                if self.db_conn.provider == 'sqlite3':
-                    fields.append(row['name'])
-                if self.db_conn.provider == 'mysql':
-                    if row['Field'] not in fields:
-                        fields.append(row['Field'])
-
-        return fields
+    def _get_table_columns(self) -> list:
+        """
+        Return the column name list for this table.
+        """
+        return list(self._get_table_schema().columns)
 
     def _insert(self, cleaned: bool=False) -> bool:
         """
@@ -221,6 +300,8 @@ class BaseTableModel(object):
         if self.db_conn is None:
             raise ConnectionError('This object has no database connection.')
 
+        self.hydrate()
+
         sql_cols = ''
         args = OrderedDict()
         ts = datetime.datetime.utcnow()
@@ -276,6 +357,8 @@ class BaseTableModel(object):
         if self.db_conn is None:
             raise ConnectionError('This object has no database connection.')
 
+        self.hydrate()
+
         sql = "UPDATE {0} SET ".format(self.Meta.db_table)
         args = OrderedDict()
 
@@ -343,6 +426,7 @@ class BaseTableModel(object):
         return self.db_conn.db_exec_commit(sql, args)
 
     def __str__(self):
+        self.hydrate()
         result = OrderedDict()
 
         for field in self.fields:
@@ -358,6 +442,297 @@ class BaseTableModel(object):
         db_table = ''  # type: str
 
 
+class _LazyField(object):
+    """
+    Decode a lazy loaded model field from the raw row on first access. Once decoded the value
+    is stored in the instance dict, which takes precedence over this descriptor.
+    """
+
+    def __init__(self, name: str, idx: int, converter=None):
+        self.name = name
+        self.idx = idx
+        self.converter = converter
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        raw = instance._raw_row
+        if raw is None:
+            return None
+
+        value = raw[self.idx]
+        if self.converter is not None:
+            value = self.converter(value)
+
+        instance.__dict__[self.name] = value
+        return value
+
+
+# Generated lazy loading model classes by model class, column set and converters.
+_lazy_classes = dict()
+
+
+def lazy_model_class(model_class: type, fields, converters: dict = None) -> type:
+    """
+    Return a lazy loading subclass of a model class for a column set, creating it the first time.
+    :param model_class: BaseTableModel subclass.
+    :param fields: Ordered column names of the raw rows.
+    :param converters: Column value converters by column name.
+    :return: BaseTableModel subclass
+    """
+    converters = converters or dict()
+    fields = tuple(fields)
+    key = (model_class, fields, tuple(converters.get(field) for field in fields))
+
+    cls = _lazy_classes.get(key)
+    if cls is not None:
+        return cls
+
+    attrs = {
+        '__module__': model_class.__module__,
+        '_lazy_fields': fields,
+    }
+    for idx, field in enumerate(fields):
+        attrs[field] = _LazyField(field, idx, converters.get(field))
+
+    cls = type(model_class.__name__, (model_class,), attrs)
+
+    return _lazy_classes.setdefault(key, cls)
+
+
+class _DeferredField(object):
+    """
+    Load a deferred model field from the database on first access. Assigning a deferred field
+    marks it as loaded, so it is written when the model is saved.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            pass
+
+        loader = instance._deferred_loader or DeferredLoader(instance.db_conn)
+        loader.load(instance, self.name)
+
+        return instance.__dict__.get(self.name)
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.name] = value
+        if self.name not in instance.fields:
+            instance.fields.append(self.name)
+
+
+class DeferredLoader(object):
+    """
+    Load a deferred field for all the model objects of a query result with one query, when the
+    field is first read on any of them.
+    """
+
+    db_conn = None  # type: BaseDBConnection
+    _instances = None  # type: weakref.WeakValueDictionary
+
+    def __init__(self, db_conn: BaseDBConnection):
+        self.db_conn = db_conn
+        self._instances = weakref.WeakValueDictionary()
+
+    def add(self, instance):
+        """
+        Add a model object to the batch of objects loaded together.
+        :param instance: Model object with a primary key value.
+        """
+        if instance.id is not None:
+            self._instances[instance.id] = instance
+
+    def load(self, instance, field: str):
+        """
+        Load a deferred field value into the given model object and every object in the batch
+        that has not loaded it yet.
+        :param instance: Model object reading the field.
+        :param field: Deferred field name.
+        """
+        if instance.id is None:
+            instance.__dict__[field] = None
+            return
+
+        targets = [instance] + [obj for obj in list(self._instances.values())
+                                if obj is not instance and field not in obj.__dict__]
+        pks = list(OrderedDict.fromkeys(obj.id for obj in targets))
+
+        queryset = BaseQuerySet(self.db_conn, instance._base_model or instance.__class__)
+        rows = queryset.filter(Q('id', QOper.O_IN, *pks)).values_list('id', field)
+        values = dict(rows)
+
+        for obj in targets:
+            obj.__dict__[field] = values.get(obj.id)
+            if field not in obj.fields:
+                obj.fields.append(field)
+
+
+# Generated deferred loading model classes by model class and deferred column set.
+_deferred_classes = dict()
+
+
+def deferred_model_class(model_class: type, fields) -> type:
+    """
+    Return a subclass of a model class that loads the given fields on first access, creating it the
+    first time.
+    :param model_class: BaseTableModel subclass.
+    :param fields: Deferred column names.
+    :return: BaseTableModel subclass
+    """
+    key = (model_class, tuple(fields))
+
+    cls = _deferred_classes.get(key)
+    if cls is not None:
+        return cls
+
+    attrs = {
+        '__module__': model_class.__module__,
+        '_deferred_fields': key[1],
+        '_base_model': model_class,
+    }
+    for field in key[1]:
+        attrs[field] = _DeferredField(field)
+
+    cls = type(model_class.__name__, (model_class,), attrs)
+
+    return _deferred_classes.setdefault(key, cls)
+
+
+class BaseTableRecord(object):
+    """
+    A compact, slotted row object. Record classes are generated for each model class and column set
+    by record_class(), their slots map directly to the query columns.
+    """
+
+    __slots__ = ('_db_conn',)
+
+    _model = None  # type: type
+    fields = tuple()  # type: tuple
+
+    def __init__(self, db_conn: BaseDBConnection, *values):
+        self._db_conn = db_conn
+        for field, value in zip(self.fields, values):
+            setattr(self, field, value)
+
+    def get_db_conn(self) -> BaseDBConnection:
+        return self._db_conn
+
+    def to_json(self, cleaned: bool=False) -> str:
+        """
+        Return a json string of the field values
+        :param cleaned: Leave out fields with null values
+        :return: string
+        """
+        return json.dumps(self.to_dict(cleaned), default=json_datetime_handler)
+
+    def to_dict(self, cleaned: bool=False) -> dict:
+        """
+        Return a dictionary of the field values
+        :param cleaned: Leave out fields with null values
+        :return: dict
+        """
+        data = OrderedDict()
+        for field in self.fields:
+            value = getattr(self, field)
+            if cleaned is False or value is not None:
+                data[field] = value
+        return data
+
+    def to_model(self) -> BaseUtilityModel_T:
+        """
+        Return a full model object holding the record values. Only the record fields are written
+        when the model is saved.
+        """
+        model = self._model(self._db_conn, self.to_dict())
+        model.fields = list(self.fields)
+        return model
+
+    def save(self, cleaned: bool=False):
+        """
+        Save the record fields to the database
+        :param cleaned: Skip fields with None value or empty lists
+        :return: self
+        """
+        if self._db_conn is None:
+            raise ConnectionError('This object has no database connection.')
+
+        saved = self.to_model().save(cleaned)
+
+        for field in self.fields:
+            if field in saved.__dict__:
+                setattr(self, field, saved.__dict__[field])
+
+        return self
+
+    def delete(self):
+        """ Delete this table record """
+        return self.to_model().delete()
+
+    def __str__(self):
+        return str(self.to_dict())
+
+    def __repr__(self):
+        return '<{0} {1}>'.format(self.__class__.__name__, self.__str__())
+
+
+# Generated record classes by model class and column set.
+_record_classes = dict()
+
+# Named tuple classes used by values_list(named=True), by column set.
+_row_namedtuples = dict()
+
+
+def record_class(model_class: type, fields) -> type:
+    """
+    Return the slotted record class for a model class and column set, creating it the first time.
+    :param model_class: BaseTableModel subclass.
+    :param fields: Ordered column names.
+    :return: BaseTableRecord subclass
+    """
+    key = (model_class, tuple(fields))
+
+    cls = _record_classes.get(key)
+    if cls is not None:
+        return cls
+
+    for field in key[1]:
+        if not field.isidentifier() or keyword.iskeyword(field) or hasattr(BaseTableRecord, field):
+            raise ModelError("column '{0}' can not be used as a record attribute name.".format(field))
+
+    cls = type('{0}Record'.format(model_class.__name__), (BaseTableRecord,), {
+        '__slots__': key[1],
+        '__module__': model_class.__module__,
+        '_model': model_class,
+        'fields': key[1],
+    })
+
+    return _record_classes.setdefault(key, cls)
+
+
+def row_namedtuple(fields) -> type:
+    """
+    Return the named tuple class for a column set, creating it the first time.
+    :param fields: Ordered column names.
+    :return: namedtuple class
+    """
+    fields = tuple(fields)
+
+    cls = _row_namedtuples.get(fields)
+    if cls is None:
+        cls = _row_namedtuples.setdefault(fields, namedtuple('Row', fields, rename=True))
+
+    return cls
+
+
 class QOper(Enum):
     """
     Operators for each Where statement clause. IE: id=1.
@@ -396,22 +771,24 @@ class QConn(Enum):
 class Q(object):
     """
     Emulate a simpler version of the django Q object
-    This is really a single linked list of ourselves that outputs the where clause
+    A Q object is either a single where clause, IE: id = 1, or a branch joining child Q objects
+    with a connector. Combining Q objects with &, | and ~ always returns a new Q object.
     """
 
     _field = None  # type: str
     _field_operator = QOper.O_EQUAL  # type: QOper
     _value = None  # type: Union[str, int, list]
     _between_value = None  # type: Union[str, int]
+    _value_table = None  # type: str
     placeholder = '??'
 
     invert = False  # type: bool
 
-    # How we connect one Q object to the next; single linked list.
-    child = None  # type: Q
-    child_connector = QConn.C_AND  # Type: QConn
+    # Branch Q objects join their children with the connector, leaf Q objects have no children.
+    children = None  # type: list
+    connector = QConn.C_AND  # type: QConn
 
-    def __init__(self, field: str, operator: QOper=QOper.O_EQUAL, value=None, *args):
+    def __init__(self, field: str=None, operator: QOper=QOper.O_EQUAL, value=None, *args):
         self._field = field
         self._field_operator = operator
         self._value = value
@@ -421,7 +798,7 @@ class Q(object):
                 self._between_value = args[0]
             else:
                 raise ValueError('Second value in between operation missing')
-        elif operator == QOper.O_IN:
+        elif operator in (QOper.O_IN, QOper.O_NOT_IN):
             values = list()
             values.append(value)
             if args:
@@ -429,9 +806,58 @@ class Q(object):
                     values.append(v)
             self._value = values
 
+    @property
+    def field(self) -> str:
+        """ Field name of a leaf Q object """
+        return self._field
+
+    @property
+    def operator(self) -> QOper:
+        """ Operator of a leaf Q object """
+        return self._field_operator
+
+    @classmethod
+    def branch(cls, conn: QConn, children, invert: bool=False) -> "Q":
+        """
+        Return a Q object joining the children Q objects with a connector.
+        :param conn: Connector between the children.
+        :param children: List of Q objects.
+        :param invert: Negate the whole branch.
+        :return: Q object
+        """
+        obj = cls()
+        obj.children = list(children)
+        obj.connector = conn
+        obj.invert = invert
+        return obj
+
+    def is_branch(self) -> bool:
+        return self.children is not None
+
+    def copy(self) -> "Q":
+        """
+        Return a shallow copy of this Q object, children are shared.
+        """
+        obj = self.__class__.__new__(self.__class__)
+        obj.__dict__.update(self.__dict__)
+        if self.children is not None:
+            obj.children = list(self.children)
+        return obj
+
     def add(self, q_object, conn: QConn=QConn.C_AND):
-        self.child = q_object
-        self.child_connector = conn
+        """
+        Join a Q object to this one in place.
+        :param q_object: Q object to add.
+        :param conn: Connector between this Q object and the new one.
+        """
+        if self.is_branch() and self.connector == conn and not self.invert:
+            self.children.append(q_object)
+            return
+
+        current = self.copy()
+        self.__dict__.clear()
+        self.children = [current, q_object]
+        self.connector = conn
 
     def negate(self):
         self.invert = not self.invert
@@ -441,18 +867,7 @@ class Q(object):
         if not isinstance(other, Q):
             raise TypeError(other)
 
-        obj = self.__class__(self._field, self._field_operator, self._value)
-        obj.invert = self.invert
-        obj._between_value = self._between_value
-
-        if self.child:
-            obj.child = self.child
-            obj.child_connector = self.child_connector
-            obj.child.add(other, conn)
-        else:
-            obj.add(other, conn)
-
-        return obj
+        return self.branch(conn, [self, other])
 
     def __or__(self, other):
         return self._combine(other, QConn.C_OR)
@@ -461,50 +876,88 @@ class Q(object):
         return self._combine(other, QConn.C_AND)
 
     def __invert__(self):
-        self.negate()
-        return self
+        obj = self.copy()
+        obj.negate()
+        return obj
 
     def __str__(self):
         """
         Return the formated where clause
         :return: where clause string
         """
+        return self.to_sql(self.placeholder)
 
-        clause = ''
-        invert = ''
-
-        placeholder = self.placeholder
+    def to_sql(self, placeholder: str) -> str:
+        """
+        Return the formated where clause using the given argument placeholder
+        :param placeholder: statement argument placeholder
+        :return: where clause string
+        """
+        invert = 'NOT ' if self.invert else ''
+
+        if self.is_branch():
+            clauses = list()
+            for child in self.children:
+                clause = child.to_sql(placeholder).strip()
+                # Nested branches keep their own grouping.
+                if child.is_branch() and len(child.children) > 1 and not child.invert:
+                    clause = '({0})'.format(clause)
+                clauses.append(clause)
+
+            clause = ' {0} '.format(self.connector.value).join(clauses)
+            if self.invert:
+                return ' NOT ({0})'.format(clause)
+            return ' ' + clause
 
         if isinstance(self._value, datetime.date):
             placeholder = "'{0}'".format(placeholder)
 
-        if self.invert:
-            invert = 'NOT '
-
         if self._field_operator == QOper.O_IS_NULL:
-            clause += ' {0} IS {1}NULL'.format(self._field, invert)
+            return ' {0} IS {1}NULL'.format(self._field, invert)
         elif self._field_operator == QOper.O_BETWEEN:
-            clause += ' {0}{1} {2} {3} AND {3}'.format(
-                        invert, self._field, self._field_operator.value, placeholder)
-        elif self._field_operator == QOper.O_IN:
+            return ' {0}{1} {2} {3} AND {3}'.format(invert, self._field, self._field_operator.value, placeholder)
+        elif self._field_operator in (QOper.O_IN, QOper.O_NOT_IN):
+            if self._value_table:
+                return ' {0}{1} {2} (SELECT value FROM {3})'.format(
+                            invert, self._field, self._field_operator.value, self._value_table)
             plhs = ', '.join(placeholder for x in self._value)
-            clause += ' {0}{1} {2} ({3})'.format(invert, self._field, self._field_operator.value, plhs)
-        else:
-            clause += ' {0}{1} {2} {3}'.format(invert, self._field, self._field_operator.value, placeholder)
+            return ' {0}{1} {2} ({3})'.format(invert, self._field, self._field_operator.value, plhs)
 
-        if self.child:
-            clause += ' {0}{1}'.format(self.child_connector.value, str(self.child))
+        return ' {0}{1} {2} {3}'.format(invert, self._field, self._field_operator.value, placeholder)
 
-        return clause
+    def get_shape(self) -> tuple:
+        """
+        Return a hashable key describing the structure of the where clause, without the argument values.
+        Where clauses with the same shape generate the same SQL.
+        :return: tuple
+        """
+        if self.is_branch():
+            return self.connector, self.invert, tuple(child.get_shape() for child in self.children)
+
+        return (
+            self._field,
+            self._field_operator,
+            self.invert,
+            len(self._value) if isinstance(self._value, list) else isinstance(self._value, datetime.date),
+            self._value_table,
+        )
 
     def get_args(self, args=None):
         """
         Return the arguments for the where clause in a list
         :return: list of arguments
         """
-        if not args:
+        if args is None:
             args = list()
 
+        if self.is_branch():
+            for child in self.children:
+                child.get_args(args)
+            return args
+
+        if self._field_operator == QOper.O_IS_NULL or self._value_table:
+            return args
+
         if isinstance(self._value, list):
             for v in self._value:
                 args.append(v)
@@ -514,64 +967,327 @@ class Q(object):
         if self._between_value is not None:
             args.append(self._between_value)
 
-        if self.child:
-            args = self.child.get_args(args)
-
         return args
 
+    def get_key(self) -> tuple:
+        """
+        Return a hashable key of the where clause including the argument values, equal where clauses
+        have equal keys.
+        :return: tuple
+        """
+        if self.is_branch():
+            return self.connector, self.invert, tuple(child.get_key() for child in self.children)
 
-class BaseQuery(object):
-    """
-    This is the object that holds the options for each SQL statement part, then generates the SQL and
-    return the results
-    """
-
-    # None or list object with fields used in query or
-    _fields = None  # type: list
-    _order_by = None  # type: list
-    _group_by = None  # type: list
-
-    _where = None  # type: Q
-    _distinct = False  # type: bool
-    _aggregate = False  # type: list
-    _limit = None  # type: int
-
-    _custom_sql = None  # type: str
-    _custom_args = None  # type: list
+        value = tuple(self._value) if isinstance(self._value, list) else self._value
+        return self._field, self._field_operator, self.invert, value, self._between_value
 
-    model = None  # type: BaseUtilityModel_T
+    def get_large_in_count(self, max_values: int) -> int:
+        """
+        Return the number of IN and NOT IN clauses with more than max_values values.
+        :param max_values: Maximum number of values bound as statement arguments.
+        """
+        if self.is_branch():
+            return sum(child.get_large_in_count(max_values) for child in self.children)
 
-    def __init__(self, model: BaseUtilityModel_T = None):
+        if self._field_operator in (QOper.O_IN, QOper.O_NOT_IN) and not self._value_table and \
+                len(self._value) > max_values:
+            return 1
+        return 0
 
-        self.model = model
+    def with_value_tables(self, max_values: int, create_table) -> "Q":
+        """
+        Return a copy of the where clause where IN and NOT IN clauses with more than max_values values
+        select their values from a table instead of binding them as statement arguments.
+        :param max_values: Maximum number of values bound as statement arguments.
+        :param create_table: Function creating a table holding a value list and returning the table name.
+        :return: Q object
+        """
+        if self.is_branch():
+            children = [child.with_value_tables(max_values, create_table) for child in self.children]
+            if all(new is old for new, old in zip(children, self.children)):
+                return self
+            obj = self.copy()
+            obj.children = children
+            return obj
+
+        if not self.get_large_in_count(max_values):
+            return self
+
+        obj = self.copy()
+        obj._value_table = create_table(self._value)
+        return obj
 
-    def clone(self, **kwargs):
+    def optimize(self) -> "Q":
         """
-        Creates a copy of the current instance. The 'kwargs' parameter can be
-        used by clients to update attributes after copying has taken place.
+        Return an equivalent, normalized where clause. Nested branches with the same connector are
+        flattened and duplicate clauses are removed. In an OR branch equality clauses on the same field
+        are folded into a single IN clause, in an AND branch a >= and a <= clause on the same field are
+        merged into a BETWEEN clause. This Q object is not changed.
+        :return: Q object
         """
+        if not self.is_branch():
+            return self
+
+        children = list()
+        for child in self.children:
+            child = child.optimize()
+            if child.is_branch() and child.connector == self.connector and not child.invert:
+                children.extend(child.children)
+            else:
+                children.append(child)
 
-        clone = self.__class__(model=self.model)
+        children = _dedupe_clauses(children)
 
-        # Clone our underscore properties
-        for k, v in self.__dict__.items():
-            if k.startswith('_'):
-                clone.__dict__[k] = self.__dict__[k]
+        if self.connector == QConn.C_OR:
+            children = _fold_in_clauses(children)
+        else:
+            children = _fold_between_clauses(children)
 
-        clone.__dict__.update(kwargs)
+        if len(children) == 1:
+            child = children[0]
+            return ~child if self.invert else child
 
-        return clone
+        return self.branch(self.connector, children, self.invert)
 
-    def set_distinct(self):
-        self._distinct = True
 
-    def set_aggregate(self, *args):
-        self._aggregate = list()
-        for arg in args:
-            self._aggregate.append(str(arg))
+def _dedupe_clauses(children: list) -> list:
+    """
+    Remove repeated where clauses, keeping the first one.
+    """
+    result = list()
+    seen = set()
 
-    def set_fields(self, fields):
-        self._fields = fields
+    for child in children:
+        try:
+            key = child.get_key()
+            if key in seen:
+                continue
+            seen.add(key)
+        except TypeError:
+            # Unhashable argument values can not be compared, keep the clause.
+            pass
+        result.append(child)
+
+    return result
+
+
+def _fold_in_clauses(children: list) -> list:
+    """
+    Fold equality and IN clauses on the same field of an OR branch into a single IN clause.
+    """
+    groups = OrderedDict()
+
+    for idx, child in enumerate(children):
+        if child.is_branch() or child.invert or \
+                child._field_operator not in (QOper.O_EQUAL, QOper.O_DBL_EQUAL, QOper.O_IN):
+            continue
+        values = child._value if isinstance(child._value, list) else [child._value]
+        # Date values use a quoted placeholder that an IN clause does not have.
+        if any(isinstance(v, datetime.date) for v in values):
+            continue
+        groups.setdefault(child._field, list()).append((idx, values))
+
+    folded = dict()
+    skipped = set()
+
+    for field, members in groups.items():
+        if len(members) < 2:
+            continue
+        values = list()
+        for idx, member_values in members:
+            for v in member_values:
+                if v not in values:
+                    values.append(v)
+            skipped.add(idx)
+        folded[members[0][0]] = Q(field, QOper.O_IN, *values)
+
+    if not folded:
+        return children
+
+    return [folded.get(idx, child) for idx, child in enumerate(children) if idx in folded or idx not in skipped]
+
+
+def _fold_between_clauses(children: list) -> list:
+    """
+    Merge a >= and a <= clause on the same field of an AND branch into a BETWEEN clause.
+    """
+    lower = OrderedDict()
+    upper = dict()
+
+    for idx, child in enumerate(children):
+        if child.is_branch() or child.invert:
+            continue
+        if child._field_operator == QOper.O_GT_EQUAL:
+            lower.setdefault(child._field, list()).append(idx)
+        elif child._field_operator == QOper.O_LT_EQUAL:
+            upper.setdefault(child._field, list()).append(idx)
+
+    folded = dict()
+    skipped = set()
+
+    for field, lower_idx in lower.items():
+        upper_idx = upper.get(field)
+        # Only a single pair is merged, choosing the tightest of several bounds needs comparable values.
+        if len(lower_idx) != 1 or not upper_idx or len(upper_idx) != 1:
+            continue
+        low, high = children[lower_idx[0]]._value, children[upper_idx[0]]._value
+        if isinstance(low, datetime.date) != isinstance(high, datetime.date):
+            continue
+        idx = min(lower_idx[0], upper_idx[0])
+        folded[idx] = Q(field, QOper.O_BETWEEN, low, high)
+        skipped.update((lower_idx[0], upper_idx[0]))
+
+    if not folded:
+        return children
+
+    return [folded.get(idx, child) for idx, child in enumerate(children) if idx in folded or idx not in skipped]
+
+
+class CompiledSQLCache(object):
+    """
+    A bounded LRU cache of compiled SELECT statements, keyed by query shape. Queries that only
+    differ in their argument values share the same compiled statement.
+    """
+
+    maxsize = 512  # type: int
+    hits = 0  # type: int
+    misses = 0  # type: int
+
+    _cache = None  # type: OrderedDict
+    _lock = None  # type: threading.Lock
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str:
+        """
+        Return the compiled statement for a query shape, or None.
+        :param key: Query shape key, the first item is the table name.
+        """
+        with self._lock:
+            sql = self._cache.get(key)
+            if sql is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return sql
+
+    def put(self, key: tuple, sql: str):
+        """
+        Store a compiled statement, dropping the least recently used statements over maxsize.
+        :param key: Query shape key, the first item is the table name.
+        :param sql: Compiled statement.
+        """
+        with self._lock:
+            self._cache[key] = sql
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def invalidate(self, db_table: str = None):
+        """
+        Drop the compiled statements of a table, or all statements.
+        :param db_table: Database table name.
+        """
+        with self._lock:
+            if db_table is None:
+                self._cache.clear()
+                return
+            for key in [key for key in self._cache if key[0] == db_table]:
+                del self._cache[key]
+
+    def stats(self) -> dict:
+        """ Return the cache statistics """
+        total = self.hits + self.misses
+        return {
+            'size': len(self._cache),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._cache)
+
+
+# Shared compiled statement cache, compiled statements are dropped when the table schema changes.
+sql_cache = CompiledSQLCache()
+schema_registry.add_listener(lambda identity, db_table: sql_cache.invalidate(db_table))
+
+
+class BaseQuery(object):
+    """
+    This is the object that holds the options for each SQL statement part, then generates the SQL and
+    return the results
+    """
+
+    # None or list object with fields used in query or
+    _fields = None  # type: list
+    _order_by = None  # type: list
+    _group_by = None  # type: list
+
+    _where = None  # type: Q
+    _optimized_where = None  # type: Q
+    _distinct = False  # type: bool
+    _aggregate = False  # type: list
+    _limit = None  # type: int
+
+    # How rows are returned: None for models, or 'lazy', 'compact', 'dict', 'tuple', 'flat' or 'named'.
+    _result_mode = None  # type: str
+
+    # Table columns left out of the SELECT list are loaded by the models on first access.
+    _deferred_loading = False  # type: bool
+
+    _custom_sql = None  # type: str
+    _custom_args = None  # type: list
+
+    model = None  # type: type
+    db_conn = None  # type: BaseDBConnection
+
+    def __init__(self, model: type = None, db_conn: BaseDBConnection = None):
+
+        self.model = model
+        self.db_conn = db_conn
+
+    def clone(self, **kwargs):
+        """
+        Creates a copy of the current instance. The 'kwargs' parameter can be
+        used by clients to update attributes after copying has taken place.
+        """
+
+        clone = self.__class__(model=self.model, db_conn=self.db_conn)
+
+        # Clone our underscore properties
+        for k, v in self.__dict__.items():
+            if k.startswith('_'):
+                clone.__dict__[k] = self.__dict__[k]
+
+        clone.__dict__.update(kwargs)
+
+        return clone
+
+    def set_distinct(self):
+        self._distinct = True
+
+    def set_aggregate(self, *args):
+        self._aggregate = list()
+        for arg in args:
+            self._aggregate.append(str(arg))
+
+    def set_fields(self, fields):
+        self._fields = fields
+
+    def set_result_mode(self, mode: str):
+        if mode not in (None, 'lazy', 'compact', 'dict', 'tuple', 'flat', 'named'):
+            raise ValueError('Invalid result mode ({0})'.format(mode))
+        self._result_mode = mode
+
+    def set_deferred_loading(self, deferred: bool = True):
+        self._deferred_loading = deferred
 
     def set_group_by(self, fields):
         self._group_by = fields
@@ -586,8 +1302,8 @@ class BaseQuery(object):
 
     def add_q(self, negate, *args, **kwargs):
         """
-        Add Q objects to self._where
-        :param negate: Invert the Q object
+        AND the Q objects to self._where, the existing Q objects are never changed.
+        :param negate: Invert the ANDed Q objects
         :param args: list of Q objects
         :param kwargs: Key/Value dictionary
         """
@@ -606,15 +1322,30 @@ class BaseQuery(object):
             for q_object in list(args):
                 q_list.append(q_object)
 
-        for q_object in q_list:
+        q_object = q_list[0] if len(q_list) == 1 else Q.branch(QConn.C_AND, q_list)
 
-            if negate:
-                q_object = ~q_object
+        if negate:
+            q_object = ~q_object
 
-            if not self._where:
-                self._where = q_object
-            else:
-                self._where.add(q_object)
+        if not self._where:
+            self._where = q_object
+        else:
+            self._where = self._where & q_object
+
+        self._optimized_where = None
+
+    def get_where(self) -> Q:
+        """
+        Return the optimized where clause, it is optimized once and kept by clones.
+        :return: Q object or None
+        """
+        if self._where is None:
+            return None
+
+        if self._optimized_where is None:
+            self._optimized_where = self._where.optimize()
+
+        return self._optimized_where
 
     def to_sql(self) -> (str, list):
         """
@@ -624,10 +1355,12 @@ class BaseQuery(object):
         sql, args = self._get_sql_query()
         return sql, args
 
-    def _get_sql_query(self):
+    def _get_sql_query(self, where: Q = None):
         """
-        Generate a parameterized sql statment and args list
+        Generate a parameterized sql statment and args list. Compiled statements are cached by
+        query shape, so queries that only differ in their argument values are compiled once.
         # TODO: Move this to the Providers
+        :param where: Use this where clause instead of the query where clause, the statement is not cached.
         :return: SQL statment, args list
         """
 
@@ -638,6 +1371,50 @@ class BaseQuery(object):
         except Exception:
             raise ModelError('db_table not defined in Model Meta class')
 
+        placeholder = self.db_conn.placeholder if self.db_conn is not None else BaseDBConnection.placeholder
+
+        if where is not None:
+            sql = self._compile_sql(db_table, placeholder, where)
+            return sql, where.get_args()
+
+        where = self.get_where()
+
+        key = self._get_shape_key(db_table, placeholder)
+        sql = sql_cache.get(key)
+
+        if sql is None:
+            sql = self._compile_sql(db_table, placeholder, where)
+            sql_cache.put(key, sql)
+
+        args = where.get_args() if where else None
+
+        return sql, args
+
+    def _get_shape_key(self, db_table: str, placeholder: str) -> tuple:
+        """
+        Return a hashable key of the query structure, argument values are not part of the key.
+        :return: tuple
+        """
+        return (
+            db_table,
+            placeholder,
+            self._distinct,
+            tuple(self._fields) if self._fields else None,
+            tuple(self._aggregate) if self._aggregate else None,
+            self.get_where().get_shape() if self._where else None,
+            tuple(self._group_by) if self._group_by else None,
+            tuple(self._order_by) if self._order_by else None,
+            self._limit,
+        )
+
+    def _compile_sql(self, db_table: str, placeholder: str, where: Q = None) -> str:
+        """
+        Generate the parameterized sql statement
+        :param db_table: Database table name.
+        :param placeholder: statement argument placeholder
+        :param where: Optimized where clause.
+        :return: SQL statement
+        """
         distinct = '' if self._distinct is False else ' DISTINCT'
 
         # Setup SELECT fields
@@ -655,11 +1432,7 @@ class BaseQuery(object):
                 fields = ', '.join(self._aggregate)
 
         # Setup SELECT WHERE clause
-        where = ''
-        args = None
-        if self._where:
-            where = ' WHERE{0}'.format(str(self._where))
-            args = self._where.get_args()
+        where = ' WHERE{0}'.format(where.to_sql(placeholder)) if where else ''
 
         # Setup SELECT GROUP BY clause
         if not self._group_by or len(self._group_by) == 0:
@@ -679,14 +1452,19 @@ class BaseQuery(object):
             limit = ' LIMIT {0}'.format(self._limit)
 
         # Build SQL query here
-        sql = 'SELECT{0} {1} FROM {2}{3}{4}{5}{6}'.format(distinct, fields, db_table, where, group_by, order_by, limit)
-
-        sql = sql.replace(Q.placeholder,  self.model.get_db_conn().placeholder)
+        return 'SELECT{0} {1} FROM {2}{3}{4}{5}{6}'.format(distinct, fields, db_table, where, group_by, order_by,
+                                                           limit)
 
-        # TODO: Future: Figure out the best location to set the correct argument value placeholder.
-        # TODO: Future: Right now we are defaulting to '?' for the argument value placeholder.
+    @staticmethod
+    def _check_connection(db_conn: BaseDBConnection):
+        """
+        Raise an error if there is no connected database connection to run the query on.
+        """
+        if not db_conn:
+            raise TypeError('db_conn parameter must be active BaseDBConnection object')
 
-        return sql, args
+        if not db_conn.db_connected():
+            raise ConnectionError('BaseDBConnection object is not connected to a database')
 
     def run_query(self, db_conn: BaseDBConnection) -> list:
         """
@@ -694,59 +1472,344 @@ class BaseQuery(object):
         :return: list of ModelBase objects populated
         :rtype: list[BaseUtilityModel_T]
         """
-        if not db_conn:
-            raise TypeError('db_conn parameter must be active BaseDBConnection object')
+        self._check_connection(db_conn)
 
-        if not db_conn.db_connected():
-            raise ConnectionError('BaseDBConnection object is not connected to a database')
+        # Throttled check for schema changes, before any rows are read.
+        schema_registry.check(db_conn)
 
-        if not self._custom_sql:
-            sql, args = self._get_sql_query()
-        else:
-            sql = self._custom_sql
-            args = self._custom_args
+        value_tables = list()
+
+        try:
+            sql, args = self._get_statement(db_conn, value_tables)
+            started = time.perf_counter()
+            columns, rows = db_conn.db_exec_stmt_rows(sql, args)
+            self._record_usage(db_conn, sql, time.perf_counter() - started)
+        finally:
+            self._drop_value_tables(db_conn, value_tables)
+
+        return self._build_results(db_conn, columns, rows)
+
+    def _record_usage(self, db_conn: BaseDBConnection, sql: str, elapsed: float):
+        """
+        Record the columns the query used with the index advisor, if it is enabled.
+        """
+        if index_advisor.enabled and not self._custom_sql:
+            index_advisor.record(db_conn, self.model.Meta.db_table, self.get_where(), self._group_by,
+                                 self._order_by, elapsed, sql)
+
+    def iter_query(self, db_conn: BaseDBConnection, chunk_size: int = 2000):
+        """
+        Make the database query now and yield the model objects, fetching chunk_size rows
+        from the database cursor at a time.
+        :return: generator of ModelBase objects
+        """
+        self._check_connection(db_conn)
+
+        # Throttled check for schema changes, no other statement can run once the rows are streamed.
+        schema_registry.check(db_conn)
+
+        value_tables = list()
+        rows = None
+
+        try:
+            # Look up the schema now, no other statement can run while an unbuffered cursor is open.
+            self._get_schema(db_conn)
+
+            sql, args = self._get_statement(db_conn, value_tables)
+            started = time.perf_counter()
+            columns, rows = db_conn.db_exec_stmt_rows(sql, args, chunk_size)
+            build = self._get_row_builder(db_conn, columns)
+
+            for row in rows:
+                yield build(row)
+
+            self._record_usage(db_conn, sql, time.perf_counter() - started)
+        finally:
+            if value_tables:
+                # Drop the value tables after the streaming cursor has been closed.
+                if hasattr(rows, 'close'):
+                    rows.close()
+                self._drop_value_tables(db_conn, value_tables)
+
+    def _build_results(self, db_conn: BaseDBConnection, columns: tuple, rows) -> list:
+        """
+        Convert the database row tuples to result objects
+        :param columns: Ordered column names of the rows
+        :param rows: list of row tuples
+        :return: list of result objects
+        """
+        if not rows:
+            return list()
 
-        if args:
-            records = db_conn.db_exec_stmt(sql, args)
+        # All rows of a statement have the same columns, setup the row conversion once.
+        build = self._get_row_builder(db_conn, columns)
+        return [build(row) for row in rows]
+
+    def _get_schema(self, db_conn: BaseDBConnection) -> TableSchema:
+        """
+        Return the table schema of the query model, or None if it can not be looked up.
+        """
+        if (db_conn is not None and not db_conn.testing) or schema_registry.get_spec(self.model):
+            return schema_registry.get_schema(db_conn, self.model)
+        return None
+
+    def _get_row_builder(self, db_conn: BaseDBConnection, columns: tuple):
+        """
+        Return a function that converts a row tuple to a result object
+        :param columns: Ordered column names of the rows
+        :return: function
+        """
+        model_class = self.model
+        mode = self._result_mode
+
+        if mode is None and getattr(model_class.Meta, 'lazy', False):
+            mode = 'lazy'
+
+        schema_columns = tuple()
+        converters = dict()
+        schema = self._get_schema(db_conn)
+        if schema is not None:
+            schema_columns = schema.columns
+            converters = schema.converters
+
+        row_converters = [(idx, col, converters[col]) for idx, col in enumerate(columns) if col in converters]
+
+        # Models hold only the selected columns and load the other table columns on first access.
+        loader = None
+        if self._deferred_loading and mode in (None, 'lazy'):
+            deferred = [col for col in schema_columns if col not in columns]
+            if deferred:
+                model_class = deferred_model_class(model_class, deferred)
+                loader = DeferredLoader(db_conn)
+
+        if mode is None:
+            # Columns that are not part of the table, IE: aggregates, are added to the model fields.
+            extra = [col for col in columns if col not in schema_columns]
+
+            def build(row):
+                model = model_class(db_conn)
+                values = model.__dict__
+                values.update(zip(columns, row))
+                for idx, col, converter in row_converters:
+                    values[col] = converter(row[idx])
+                if loader is not None:
+                    model.fields = list(columns)
+                    model._deferred_loader = loader
+                    loader.add(model)
+                elif extra:
+                    model.fields.extend(extra)
+                return model
+
+            return build
+
+        if mode == 'lazy':
+            cls = lazy_model_class(model_class, columns, converters)
+            if loader is not None:
+                fields = list(columns)
+            else:
+                fields = list(schema_columns) + [col for col in columns if col not in schema_columns]
+
+            def build(row):
+                model = cls(db_conn)
+                model.fields = list(fields)
+                model._raw_row = row
+                if loader is not None:
+                    model._deferred_loader = loader
+                    loader.add(model)
+                return model
+
+            return build
+
+        if mode == 'flat':
+            converter = converters.get(columns[0])
+            if converter is None:
+                return lambda row: row[0]
+            return lambda row: converter(row[0])
+
+        if mode == 'dict':
+            def make(values):
+                return dict(zip(columns, values))
+        elif mode == 'compact':
+            cls = record_class(model_class, columns)
+
+            def make(values):
+                return cls(db_conn, *values)
+        elif mode == 'named':
+            make = row_namedtuple(columns)._make
         else:
-            records = db_conn.db_exec_stmt(sql)
+            make = tuple
+
+        if not row_converters:
+            return make
+
+        def build(row):
+            values = list(row)
+            for idx, col, converter in row_converters:
+                values[idx] = converter(values[idx])
+            return make(values)
+
+        return build
+
+    def _get_statement(self, db_conn: BaseDBConnection = None, value_tables: list = None) -> (str, list):
+        """
+        Return the custom SQL statement and arguments if set, otherwise generate them. IN clauses with more
+        values than the connection max_in_values are loaded into temporary value tables, the table names
+        are added to value_tables and must be dropped by the caller.
+        :param db_conn: Database connection the statement will run on.
+        :param value_tables: List to add created value table names to.
+        :return: SQL statement, args list
+        """
+        if self._custom_sql:
+            return self._custom_sql, self._custom_args
+
+        where = self._get_value_table_where(db_conn, value_tables)
+        if where is None:
+            return self._get_sql_query()
 
-        results = list()
+        return self._get_sql_query(where)
+
+    def _get_value_table_where(self, db_conn: BaseDBConnection = None, value_tables: list = None) -> Q:
+        """
+        Return the where clause with the large IN clauses selecting from temporary value tables, or None
+        if the where clause has no large IN clauses.
+        :param db_conn: Database connection the statement will run on.
+        :param value_tables: List to add created value table names to.
+        :return: Q object or None
+        """
+        where = self.get_where()
 
-        if records:
+        if db_conn is None or value_tables is None or not where or \
+                not where.get_large_in_count(db_conn.max_in_values):
+            return None
+
+        def create_table(values):
+            value_tables.append(db_conn.db_create_value_table(values))
+            return value_tables[-1]
+
+        return where.with_value_tables(db_conn.max_in_values, create_table)
+
+    @staticmethod
+    def _drop_value_tables(db_conn: BaseDBConnection, value_tables: list):
+        """
+        Drop the temporary value tables created for a statement.
+        """
+        while value_tables:
+            db_conn.db_drop_value_table(value_tables.pop())
 
-            # TODO: Future: maybe change this to a fetchmany() and return a smaller set each time like django does
+    def explain(self, db_conn: BaseDBConnection) -> QueryPlan:
+        """
+        Return the database execution plan of the query statement and arguments.
+        :return: QueryPlan object
+        """
+        self._check_connection(db_conn)
 
-            for record in records:
-                model = self.model.__class__(db_conn, record)
-                results.append(model)
+        value_tables = list()
 
-        return results
+        try:
+            sql, args = self._get_statement(db_conn, value_tables)
+            return db_conn.db_explain(sql, args)
+        finally:
+            self._drop_value_tables(db_conn, value_tables)
 
     def count(self, db_conn) -> int:
         """
-        Return the number of records in the table
+        Return the number of records the query matches. Distinct, grouped, limited, aggregate and custom
+        queries are counted as a subquery.
         # TODO: Move this to the Providers
         :return: record count
         """
+        self._check_connection(db_conn)
 
-        if not self._custom_sql:
-            sql = "SELECT count(1) AS count from {0}".format(self.model.Meta.db_table)
-            args = None
-        else:
-            sql = "SELECT count(1) as count from ({0})".format(self._custom_sql)
-            args = self._custom_args
+        value_tables = list()
 
-        if args:
-            record = db_conn.db_exec_stmt(sql, args)
-        else:
-            record = db_conn.db_exec_stmt(sql)
+        try:
+            query = self
 
-        if record:
-            return int(record[0]['count'] if isinstance(record, list) else record['count'])
+            if self._custom_sql or self._distinct or self._group_by or self._aggregate or self._limit is not None:
+                sql, args = self._get_statement(db_conn, value_tables)
+                sql = 'SELECT COUNT(*) AS count FROM ({0}) AS count_query'.format(sql)
+            else:
+                query = self.clone()
+                query.set_fields(None)
+                query.set_aggregate('COUNT(*) AS count')
+                query.set_order_by(None)
+                sql, args = query._get_statement(db_conn, value_tables)
+
+            started = time.perf_counter()
+            columns, rows = db_conn.db_exec_stmt_rows(sql, args)
+            query._record_usage(db_conn, sql, time.perf_counter() - started)
+        finally:
+            self._drop_value_tables(db_conn, value_tables)
+
+        if rows:
+            return int(rows[0][0])
 
         return 0
 
+    def update(self, db_conn: BaseDBConnection, values: dict) -> int:
+        """
+        Set column values of every record the query matches with a single UPDATE statement and commit.
+        The modified column is set as well if the table has one and it is not given.
+        :param db_conn: Database connection object.
+        :param values: dict of column name to new value.
+        :return: Number of rows changed.
+        """
+        self._check_connection(db_conn)
+
+        if self._custom_sql:
+            raise ValueError('update() can not be used with a custom SQL query.')
+
+        if self._distinct or self._group_by or self._aggregate or self._limit is not None:
+            raise ValueError('update() can not be used with distinct, grouped, aggregate or limited queries.')
+
+        if not values:
+            raise ValueError('update() requires at least one field value.')
+
+        if 'id' in values:
+            raise ValueError("The 'id' field can not be updated.")
+
+        try:
+            db_table = self.model.Meta.db_table
+            if not db_table:
+                raise ModelError('db_table not defined in Model Meta class')
+        except Exception:
+            raise ModelError('db_table not defined in Model Meta class')
+
+        columns = schema_registry.get_columns(db_conn, self.model)
+
+        unknown = [field for field in values if field not in columns]
+        if unknown:
+            raise ValueError('update() unknown fields: {0}'.format(', '.join(unknown)))
+
+        values = OrderedDict(values)
+
+        # Support modified fields if present in table schema.
+        if 'modified' in columns and 'modified' not in values:
+            values['modified'] = datetime.datetime.utcnow()
+
+        sanitize = self.model(None)._sanitize
+        placeholder = db_conn.placeholder
+        value_tables = list()
+
+        try:
+            where = self._get_value_table_where(db_conn, value_tables) or self.get_where()
+
+            sets = ', '.join('`{0}` = {1}'.format(field, placeholder) for field in values)
+            sql = 'UPDATE {0} SET {1}'.format(db_table, sets)
+            args = [sanitize(value) for value in values.values()]
+
+            if where:
+                sql += ' WHERE{0}'.format(where.to_sql(placeholder))
+                args.extend(where.get_args() or list())
+
+            started = time.perf_counter()
+            changed = db_conn.db_exec_many(sql, [args])
+            self._record_usage(db_conn, sql, time.perf_counter() - started)
+        finally:
+            self._drop_value_tables(db_conn, value_tables)
+
+        return changed or 0
+
 
 class BaseQuerySet(object):
     """
@@ -761,16 +1824,23 @@ class BaseQuerySet(object):
     _order_by = None  # type: list
 
     query = None  # type: BaseQuery
-    model = None  # type: BaseUtilityModel_T
+    model = None  # type: type
 
-    def __init__(self, db_conn: BaseDBConnection, model: BaseUtilityModel_T=None, query: BaseQuery=None):
+    def __init__(self, db_conn: BaseDBConnection, model: type=None, query: BaseQuery=None):
+        """
+        :param db_conn: Database connection object.
+        :param model: Model class, a model object is accepted as well.
+        :param query: BaseQuery object, a new query is created if not given.
+        """
+        if isinstance(model, BaseTableModel):
+            model = model.__class__
 
-        if not isinstance(model, BaseTableModel):
-            raise ModelRequired('model parameter must be a ModelBase object')
+        if not isinstance(model, type) or not issubclass(model, BaseTableModel):
+            raise ModelRequired('model parameter must be a ModelBase class')
 
         self._db_conn = db_conn
         self.model = model
-        self.query = query or BaseQuery(self.model)
+        self.query = query or BaseQuery(self.model, db_conn)
 
     def get_db_conn(self) -> BaseDBConnection:
         """
@@ -788,9 +1858,9 @@ class BaseQuerySet(object):
         query = self.query.clone()
         clone = self.__class__(db_conn=self._db_conn, model=self.model, query=query)
 
-        # Clone our underscore properties
+        # Clone our underscore properties, the results of the new query are fetched again.
         for k, v in self.__dict__.items():
-            if k.startswith('_'):
+            if k.startswith('_') and k != '_result_cache':
                 clone.__dict__[k] = self.__dict__[k]
 
         clone.query = query
@@ -829,7 +1899,11 @@ class BaseQuerySet(object):
     #     return '<%s %r>' % (self.__class__.__name__, data)
 
     def __len__(self):
-        self._fetch_all()
+        """
+        Return the number of results, counted by the database if the results have not been fetched.
+        """
+        if self._result_cache is None:
+            return self.count()
         return len(self._result_cache)
 
     def __iter__(self):
@@ -840,7 +1914,11 @@ class BaseQuerySet(object):
         return iter(self._result_cache)
 
     def __bool__(self):
-        self._fetch_all()
+        """
+        Return True if there are results, checked by the database if the results have not been fetched.
+        """
+        if self._result_cache is None:
+            return self.exists()
         return bool(self._result_cache)
 
     def __nonzero__(self):  # Python 2 compatibility
@@ -852,24 +1930,13 @@ class BaseQuerySet(object):
         """
         self._fetch_all()
 
+        # Return the cached result objects, use clone() on a result to get an independent copy.
         if isinstance(k, int):
-            if k < 0:
-                k += len(self._result_cache)
-            if 0 <= k < len(self._result_cache):
-                return self._result_cache[k].clone()
+            if -len(self._result_cache) <= k < len(self._result_cache):
+                return self._result_cache[k]
             raise IndexError('The index ({0}) is out of range.'.format(k))
         elif isinstance(k, slice):
-            start = k.start if k.start else 0
-            if start < 0:
-                start += len(self._result_cache)
-            if start > len(self._result_cache):
-                start = len(self._result_cache)
-            stop = k.stop if k.stop else len(self._result_cache)
-            if stop < 0:
-                stop += len(self._result_cache)
-            if stop > len(self._result_cache):
-                stop = len(self._result_cache)
-            return [self._result_cache[x].clone() for x in range(start, stop, k.step if k.step else 1)]
+            return self._result_cache[k]
         raise TypeError("Invalid argument type.")
 
     def raw_query(self, sql, *args, **kwargs) -> "BaseQuerySet":
@@ -897,17 +1964,209 @@ class BaseQuerySet(object):
             result = self.query.run_query(self._db_conn)
             self._result_cache = result
 
-    def values_list(self, *fields, **kwargs) -> "BaseQuerySet":
+    def explain(self) -> QueryPlan:
+        """
+        Return the database execution plan of the query. The plan flags full table scans, temporary
+        b-trees and filesorts, IE: queryset.explain().has_full_scan.
+        :return: QueryPlan object
+        """
+        return self.query.explain(self._db_conn)
+
+    def iterator(self, chunk_size: int = 2000):
+        """
+        Return a generator over the query results that fetches chunk_size rows from the database
+        at a time. The results are not stored in the result cache, so large tables can be scanned
+        in a fixed amount of memory.
+        :param chunk_size: number of rows to fetch from the database cursor at a time
+        :return: generator of model objects
+        """
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError('chunk_size must be a positive integer')
+
+        return self.query.iter_query(self._db_conn, chunk_size)
+
+    def paginate_by_key(self, key: Union[str, tuple] = 'id', page_size: int = 100):
+        """
+        Yield the query results in pages ordered by a unique key. Each page seeks past the last key of the
+        previous page, IE: WHERE id > last_id ORDER BY id LIMIT page_size, so deep pages cost the same as the
+        first page. The key columns must be part of the results.
+        :param key: Column name, or a tuple of column names for a composite key IE: ('modified', 'id').
+        :param page_size: Number of records in each page.
+        :return: generator of BaseQuerySet pages, each with its results already fetched
+        """
+        keys = (key,) if isinstance(key, str) else tuple(key)
+
+        if not keys:
+            raise ValueError('key must name at least one column')
+
+        if not isinstance(page_size, int) or page_size <= 0:
+            raise ValueError('page_size must be a positive integer')
+
+        base = self.order_by(*keys)
+        last = None
+
+        while True:
+            page = base
+            if last is not None:
+                page = page.filter(self._get_seek_q(keys, last))
+            page = page.limit(page_size)
+            page._fetch_all()
+
+            if not page._result_cache:
+                break
+
+            yield page
+
+            if len(page._result_cache) < page_size:
+                break
+
+            last = page._get_key_values(page._result_cache[-1], keys)
+
+    @staticmethod
+    def _get_seek_q(keys: tuple, values: tuple) -> Q:
+        """
+        Return the where clause selecting the rows after the given key values, IE: for the key (a, b)
+        a > x OR (a = x AND b > y).
+        """
+        # Dates are bound as strings, a date argument would get a quoted placeholder.
+        values = [str(v) if isinstance(v, datetime.date) else v for v in values]
+
+        q_object = Q(keys[-1], QOper.O_GT, values[-1])
+        for idx in range(len(keys) - 2, -1, -1):
+            q_object = Q(keys[idx], QOper.O_GT, values[idx]) | (Q(keys[idx], QOper.O_EQUAL, values[idx]) & q_object)
+
+        return q_object
+
+    def _get_key_values(self, result, keys: tuple) -> tuple:
+        """
+        Return the key values of a result object, dict or tuple.
+        """
+        if isinstance(result, dict):
+            return tuple(result[k] for k in keys)
+
+        mode = self.query._result_mode
 
+        if mode in ('flat', 'tuple', 'named'):
+            fields = list(self.query._fields or schema_registry.get_columns(self._db_conn, self.model))
+            if not set(keys).issubset(fields) or (mode == 'flat' and keys != (fields[0],)):
+                raise ModelFieldRequired('paginate_by_key() key columns must be selected in the results.')
+            if mode == 'flat':
+                return (result,)
+            return tuple(result[fields.index(k)] for k in keys)
+
+        return tuple(getattr(result, k) for k in keys)
+
+    def values(self, *fields, **kwargs) -> "BaseQuerySet":
+        """
+        Return the results as dicts, read straight from the database rows without creating models.
+        :param fields: Column names to select, all columns if empty.
+        """
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments to values: %s' % (list(kwargs),))
+
+        clone = self._clone()
+        if fields:
+            clone._fields = list(fields)
+            clone.query.set_fields(fields)
+        clone.query.set_result_mode('dict')
+
+        return clone
+
+    def values_list(self, *fields, flat: bool = False, named: bool = False, **kwargs) -> "BaseQuerySet":
+        """
+        Return the results as tuples, read straight from the database rows without creating models.
+        :param fields: Column names to select, all columns if empty.
+        :param flat: Return single values instead of 1-tuples, only valid with one field.
+        :param named: Return named tuples.
+        """
         if kwargs:
             raise TypeError('Unexpected keyword arguments to values_list: %s' % (list(kwargs),))
 
+        if flat and named:
+            raise TypeError("'flat' and 'named' can't be used together.")
+
+        if flat and len(fields) != 1:
+            raise TypeError("'flat' is not valid when values_list is called with more than one field.")
+
         clone = self._clone()
         clone._fields = list(fields)
         clone.query.set_fields(fields)
+        clone.query.set_result_mode('flat' if flat else 'named' if named else 'tuple')
 
         return clone
 
+    def only(self, *fields) -> "BaseQuerySet":
+        """
+        Return model objects loaded with only the given fields and the id. The other fields are read
+        from the database on first access, for all the objects of the result at once. Saving a model
+        only writes the loaded fields.
+        :param fields: Column names to load.
+        """
+        if not fields:
+            raise TypeError('only() requires at least one field.')
+
+        clone = self._clone()
+        clone._fields = ['id'] + [field for field in fields if field != 'id']
+        clone.query.set_fields(clone._fields)
+        clone.query.set_deferred_loading()
+
+        return clone
+
+    def defer(self, *fields) -> "BaseQuerySet":
+        """
+        Return model objects loaded without the given fields. The deferred fields are read from the
+        database on first access, for all the objects of the result at once. Saving a model only writes
+        the loaded fields.
+        :param fields: Column names to leave out.
+        """
+        if 'id' in fields:
+            raise ValueError("The 'id' field can not be deferred.")
+
+        columns = self.query._fields if self.query._deferred_loading else \
+            schema_registry.get_columns(self._db_conn, self.model)
+
+        clone = self._clone()
+        clone._fields = [col for col in columns if col not in fields]
+        clone.query.set_fields(clone._fields)
+        clone.query.set_deferred_loading()
+
+        return clone
+
+    def lazy(self) -> "BaseQuerySet":
+        """
+        Return model objects that keep the raw row values and only decode a field the first
+        time it is read. Set 'lazy = True' in a model Meta class to make this the default.
+        """
+        clone = self._clone()
+        clone.query.set_result_mode('lazy')
+        return clone
+
+    def compact(self) -> "BaseQuerySet":
+        """
+        Return the results as compact slotted record objects instead of full model objects. Records
+        support to_dict(), save() and delete(), and use much less memory per row.
+        """
+        clone = self._clone()
+        clone.query.set_result_mode('compact')
+        return clone
+
+    def columns(self, *fields, chunk_size: int = 2000) -> ColumnarResult:
+        """
+        Stream the query results into a column oriented result. Integer and float columns are
+        stored in typed array buffers, other columns in lists.
+        :param fields: Column names to select, all columns if empty.
+        :param chunk_size: number of rows to fetch from the database cursor at a time
+        :return: ColumnarResult object
+        """
+        clone = self.values(*fields)
+
+        types = dict()
+        if (self._db_conn is not None and not self._db_conn.testing) or schema_registry.get_spec(self.model):
+            spec = schema_registry.get_schema(self._db_conn, self.model).spec or tuple()
+            types = {col.name: col.py_type for col in spec if col.py_type is not None}
+
+        return ColumnarResult.from_rows(clone.iterator(chunk_size), types, chunk_size)
+
     def order_by(self, *fields, **kwargs) -> "BaseQuerySet":
 
         if kwargs:
@@ -993,40 +2252,317 @@ class BaseQuerySet(object):
 
     def get(self, *args, **kwargs) -> BaseUtilityModel_T:
         """
-        Performs the query and returns a single object matching the given keyword arguments.
+        Performs the query and returns a single object matching the given keyword arguments. At most
+        two records are read from the database.
 
         Parameters can be either Q objects using And/Or IE: get(Q() & Q()) or
         key/value pairs IE: get(id=1, name='zappa')
         """
 
-        clone = self._clone()
-
-        # Check for field/value pairs
-        if kwargs:
-            for field in kwargs:
-                # For the field/value to be in kwargs, the equal sign was used.
-                clone = self.filter(Q(field, QOper.O_EQUAL, kwargs[field]))
-        elif args:
+        if args or kwargs:
             clone = self.filter(*args, **kwargs)
+        elif self._result_cache is not None:
+            clone = self
+        else:
+            clone = self._clone()
+
+        # Two records are enough to know there is more than one match.
+        if clone._result_cache is None and (clone.query._limit is None or clone.query._limit > 2):
+            clone.query.set_limit(2)
 
-        num = len(clone)  # Force _result_cache to be populated
+        clone._fetch_all()
+        num = len(clone._result_cache)
         if num == 1:
             return clone._result_cache[0]
         if not num:
             raise DoesNotExist(
                 "%s: query returned no records." %
-                self.model.__class__.__name__
+                self.model.__name__
             )
         raise MultipleObjectsReturned(
-            "get() returned more than one %s -- it returned %s!" %
-            (self.model.__class__.__name__, num)
+            "get() returned more than one %s." %
+            self.model.__name__
         )
 
+    def exists(self) -> bool:
+        """
+        Return True if the query matches any records, using SELECT 1 ... LIMIT 1.
+        :return: bool
+        """
+        if self._result_cache is not None:
+            return bool(self._result_cache)
+
+        if self.query._custom_sql:
+            self._fetch_all()
+            return bool(self._result_cache)
+
+        query = self.query.clone()
+        query.set_fields(['1'])
+        query.set_aggregate()
+        query.set_order_by(None)
+        query.set_limit(min(query._limit, 1) if query._limit is not None else 1)
+        query.set_result_mode('flat')
+
+        return bool(query.run_query(self._db_conn))
+
+    def first(self) -> BaseUtilityModel_T:
+        """
+        Return the first record of the query, ordered by id if the query is not ordered, or None.
+        """
+        if self._result_cache is not None:
+            return self._result_cache[0] if self._result_cache else None
+
+        clone = self if self.query._order_by else self.order_by('id')
+        clone = clone.limit(min(clone.query._limit, 1) if clone.query._limit is not None else 1)
+        clone._fetch_all()
+
+        return clone._result_cache[0] if clone._result_cache else None
+
+    def last(self) -> BaseUtilityModel_T:
+        """
+        Return the last record of the query, ordered by id if the query is not ordered, or None.
+        """
+        if self._result_cache is not None:
+            return self._result_cache[-1] if self._result_cache else None
+
+        # The last record of a limited query is only known after reading all of it.
+        if self.query._limit is not None or self.query._custom_sql:
+            self._fetch_all()
+            return self.last()
+
+        order_by = [self._reverse_order(field) for field in self.query._order_by or ['id']]
+        clone = self.order_by(*order_by).limit(1)
+        clone._fetch_all()
+
+        return clone._result_cache[0] if clone._result_cache else None
+
+    @staticmethod
+    def _reverse_order(field: str) -> str:
+        """
+        Return the ORDER BY terms sorting in the opposite direction, IE: 'status, id DESC' -> 'status DESC, id'.
+        """
+        terms = list()
+        depth = 0
+        start = 0
+
+        # Split on the commas between terms, not the commas of function arguments.
+        for idx, char in enumerate(field):
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                terms.append(field[start:idx])
+                start = idx + 1
+        terms.append(field[start:])
+
+        reversed_terms = list()
+        for term in terms:
+            term = term.strip()
+            upper = term.upper()
+
+            if upper.endswith(' DESC'):
+                term = term[:-5].rstrip()
+            elif upper.endswith(' ASC'):
+                term = term[:-4].rstrip() + ' DESC'
+            else:
+                term += ' DESC'
+            reversed_terms.append(term)
+
+        return ', '.join(reversed_terms)
+
+    def bulk_create(self, instances, batch_size: int = 1000) -> list:
+        """
+        Insert model objects batch_size rows per statement, in a single transaction. Only the fields set
+        on an object are inserted, so unset columns get their database defaults, and objects with
+        different fields set are inserted by separate statements. The created and modified fields are set
+        once per batch. The generated ids are set on the objects when the provider can return them.
+        :param instances: List of model objects.
+        :param batch_size: Number of rows inserted by each statement.
+        :return: list of model objects
+        """
+        instances = list(instances)
+
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError('batch_size must be a positive integer')
+
+        if not instances:
+            return instances
+
+        for obj in instances:
+            if not isinstance(obj, self.model):
+                raise ModelRequired('bulk_create() objects must be {0} objects'.format(self.model.__name__))
+
+        db_conn = self._db_conn or instances[0].db_conn
+        if db_conn is None:
+            raise ConnectionError('This object has no database connection.')
+
+        # Group the objects by the fields they have set, objects without an id get a generated one.
+        groups = OrderedDict()
+        for obj in instances:
+            obj.hydrate()
+            columns = tuple(field for field in obj.fields if field in ('created', 'modified') or
+                            (field in obj.__dict__ and (field != 'id' or obj.id)))
+            if not columns:
+                raise ValueError('bulk_create() objects must have at least one field set.')
+            groups.setdefault(columns, list()).append(obj)
+
+        try:
+            for columns, objects in groups.items():
+                sql = 'INSERT INTO {0} ({1}) VALUES ({2})'.format(
+                            self.model.Meta.db_table, ', '.join('`{0}`'.format(field) for field in columns),
+                            ', '.join(db_conn.placeholder for field in columns))
+
+                for start in range(0, len(objects), batch_size):
+                    batch = objects[start:start + batch_size]
+
+                    ts = datetime.datetime.utcnow()
+                    rows = list()
+                    for obj in batch:
+                        if 'created' in columns:
+                            obj.created = ts
+                        if 'modified' in columns:
+                            obj.modified = ts
+                        rows.append([obj._sanitize(obj.__dict__[field]) for field in columns])
+
+                    db_conn.db_exec_many(sql, rows, commit=False)
+
+                    ids = None if 'id' in columns else db_conn.db_last_insert_ids(len(batch))
+                    if ids:
+                        for obj, pk in zip(batch, ids):
+                            obj.id = pk
+
+            db_conn.db_commit()
+
+        except Exception:
+            db_conn.db_rollback()
+            raise
+
+        return instances
+
+    def bulk_update(self, instances, fields, batch_size: int = 1000) -> int:
+        """
+        Write the given fields of model objects batch_size rows at a time, in a single transaction. The
+        modified field is set once per batch. Providers either run one UPDATE statement per batch using
+        UPDATE ... SET field = CASE id WHEN ... END, or run the UPDATE with executemany.
+        :param instances: List of model objects with ids.
+        :param fields: Field names to write.
+        :param batch_size: Number of rows written by each round trip.
+        :return: Number of rows changed.
+        """
+        instances = list(instances)
+        fields = list(fields)
+
+        if not fields:
+            raise ValueError('bulk_update() requires at least one field.')
+
+        if 'id' in fields:
+            raise ValueError("The 'id' field can not be updated.")
+
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError('batch_size must be a positive integer')
+
+        if not instances:
+            return 0
+
+        for obj in instances:
+            if not isinstance(obj, self.model):
+                raise ModelRequired('bulk_update() objects must be {0} objects'.format(self.model.__name__))
+            if not obj.id:
+                raise ValueError('bulk_update() objects must have an id.')
+
+        db_conn = self._db_conn or instances[0].db_conn
+        if db_conn is None:
+            raise ConnectionError('This object has no database connection.')
+
+        # Objects loaded with only() or defer() do not list every table column.
+        columns = schema_registry.get_columns(db_conn, self.model)
+
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise ValueError('bulk_update() unknown fields: {0}'.format(', '.join(unknown)))
+
+        # Support modified fields if present in table schema.
+        modified = 'modified' not in fields and 'modified' in columns
+
+        db_table = self.model.Meta.db_table
+        placeholder = db_conn.placeholder
+        changed = 0
+
+        try:
+            for start in range(0, len(instances), batch_size):
+                batch = instances[start:start + batch_size]
+
+                ts = datetime.datetime.utcnow()
+                if modified:
+                    for obj in batch:
+                        obj.modified = ts
+
+                values = [[obj._sanitize(getattr(obj, field)) for field in fields] for obj in batch]
+
+                if db_conn.case_bulk_update:
+                    sql, args = self._get_case_update(db_table, placeholder, fields, batch, values,
+                                                      ts if modified else None)
+                    changed += db_conn.db_exec_many(sql, [args], commit=False) or 0
+                else:
+                    sets = ['`{0}` = {1}'.format(field, placeholder) for field in fields]
+                    if modified:
+                        sets.append('`modified` = {0}'.format(placeholder))
+                    sql = 'UPDATE {0} SET {1} WHERE `id` = {2}'.format(db_table, ', '.join(sets), placeholder)
+
+                    rows = [row + ([ts] if modified else []) + [obj.id] for obj, row in zip(batch, values)]
+                    changed += db_conn.db_exec_many(sql, rows, commit=False) or 0
+
+            db_conn.db_commit()
+
+        except Exception:
+            db_conn.db_rollback()
+            raise
+
+        return changed
+
+    @staticmethod
+    def _get_case_update(db_table: str, placeholder: str, fields: list, batch: list, values: list,
+                         modified: datetime.datetime = None) -> (str, list):
+        """
+        Return an UPDATE statement setting each field with a CASE on the id, and its arguments.
+        """
+        sets = list()
+        args = list()
+
+        for idx, field in enumerate(fields):
+            sets.append('`{0}` = CASE `id` {1} ELSE `{0}` END'.format(
+                            field, ' '.join('WHEN {0} THEN {0}'.format(placeholder) for obj in batch)))
+            for obj, row in zip(batch, values):
+                args.extend((obj.id, row[idx]))
+
+        if modified is not None:
+            sets.append('`modified` = {0}'.format(placeholder))
+            args.append(modified)
+
+        sql = 'UPDATE {0} SET {1} WHERE `id` IN ({2})'.format(
+                    db_table, ', '.join(sets), ', '.join(placeholder for obj in batch))
+        args.extend(obj.id for obj in batch)
+
+        return sql, args
+
+    def update(self, **values) -> int:
+        """
+        Set column values of every record the query matches with a single UPDATE statement, without
+        loading the records. The modified field is set as well if the table has one.
+        :param values: Field names and their new values.
+        :return: Number of rows changed.
+        """
+        self._result_cache = None
+        return self.query.update(self._db_conn, values)
+
     def count(self) -> int:
         """
-        Return the number of records in the table
+        Return the number of records the query matches, using the result cache if it is populated
         :return: record count
         """
+        if self._result_cache is not None:
+            return len(self._result_cache)
         return self.query.count(self._db_conn)
 
 
@@ -0,0 +1,382 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2018 Robert Abram - All Rights Reserved.
+#
+#
+# Process wide table schema registry. Table columns are introspected once per
+# database and table, then shared by every model instance.
+#
+
+import datetime
+import threading
+import time
+
+from dateutil.parser import parse as dateparse
+
+from salty_orm.db.base_provider import BaseDBConnection
+
+
+def to_datetime(value):
+    """
+    Convert a database value to a datetime object. Values that are already typed pass through.
+    """
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    if isinstance(value, bytes):
+        value = value.decode()
+
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+
+    # Slow path for formats fromisoformat does not understand.
+    try:
+        return dateparse(value)
+    except Exception:
+        return value
+
+
+def to_date(value):
+    """
+    Convert a database value to a date object. Values that are already typed pass through.
+    """
+    if value is None:
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    if isinstance(value, bytes):
+        value = value.decode()
+
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        return dateparse(value).date()
+    except Exception:
+        return value
+
+
+# Value converters by column python type, columns of other types are passed through untouched.
+TYPE_CONVERTERS = {
+    datetime.datetime: to_datetime,
+    datetime.date: to_date,
+}
+
+
+def py_type_from_decl(decl_type: str):
+    """
+    Map a declared SQL column type, IE: 'varchar(20)' or 'datetime(6)', to a python type.
+    :param decl_type: Declared column type.
+    :return: python type or None if unknown.
+    """
+    decl_type = (decl_type or '').lower()
+
+    if 'datetime' in decl_type or 'timestamp' in decl_type:
+        return datetime.datetime
+    if decl_type.startswith('date'):
+        return datetime.date
+    if 'int' in decl_type or decl_type.startswith('bool'):
+        return int
+    if 'char' in decl_type or 'text' in decl_type or 'clob' in decl_type:
+        return str
+    if 'real' in decl_type or 'floa' in decl_type or 'doub' in decl_type:
+        return float
+    return None
+
+
+class Column(object):
+    """
+    A column definition used in a model Meta.columns spec. When a model defines Meta.columns the spec
+    is trusted and the table is never introspected. Model fields are named after their database columns.
+    """
+
+    name = None  # type: str
+    py_type = None  # type: type
+    null = True  # type: bool
+    primary_key = False  # type: bool
+
+    def __init__(self, name: str, py_type: type = None, null: bool = True, primary_key: bool = False):
+        """
+        :param name: Database column name, also the model field name.
+        :param py_type: Python type of the column values, IE: int, str, datetime.
+        :param null: Column allows null values.
+        :param primary_key: Column is the table primary key.
+        """
+        self.name = name
+        self.py_type = py_type
+        self.null = null
+        self.primary_key = primary_key
+
+    def __repr__(self):
+        return 'Column({0!r}, {1})'.format(self.name, getattr(self.py_type, '__name__', None))
+
+
+class TableSchema(object):
+    """
+    Cached column information for a single database table.
+    """
+
+    db_table = None  # type: str
+    columns = None  # type: tuple
+    spec = None  # type: tuple
+    converters = None  # type: dict
+
+    def __init__(self, db_table: str, columns, spec=None):
+        """
+        :param db_table: Database table name.
+        :param columns: Ordered list of column names.
+        :param spec: Ordered list of Column objects, if known.
+        """
+        self.db_table = db_table
+        self.columns = tuple(columns)
+        self.spec = tuple(spec) if spec else None
+
+        # Build the per column value converters once, from the declared column types.
+        self.converters = dict()
+        for col in self.spec or tuple():
+            if col.py_type in TYPE_CONVERTERS:
+                self.converters[col.name] = TYPE_CONVERTERS[col.py_type]
+
+    @classmethod
+    def from_spec(cls, db_table: str, spec) -> "TableSchema":
+        """
+        Build a table schema from a model Meta.columns spec.
+        :param db_table: Database table name.
+        :param spec: Ordered list of Column objects.
+        :return: TableSchema object
+        """
+        return cls(db_table, [col.name for col in spec], spec)
+
+    def __repr__(self):
+        return '<TableSchema {0} {1}>'.format(self.db_table, list(self.columns))
+
+
+class SchemaRegistry(object):
+    """
+    Process wide cache of table schemas, keyed by connection identity and table name. The schema
+    fingerprint of a database is recorded when its first table is introspected, queries then call
+    check() to notice schema changes, at most once per check_interval.
+    """
+
+    _schemas = None  # type: dict
+    _specs = None  # type: dict
+    _lock = None  # type: threading.Lock
+
+    _fingerprints = None  # type: dict
+    _last_check = None  # type: dict
+    _listeners = None  # type: list
+
+    # Minimum number of seconds between schema fingerprint checks for each database.
+    check_interval = 30.0  # type: float
+
+    def __init__(self):
+        self._schemas = dict()
+        self._specs = dict()
+        self._lock = threading.Lock()
+        self._fingerprints = dict()
+        self._last_check = dict()
+        self._listeners = list()
+
+    @staticmethod
+    def get_spec(model):
+        """
+        Return the Meta.columns spec of a model, or None if the model does not define one.
+        :param model: Model class, model instance or table name.
+        """
+        meta = getattr(model, 'Meta', None)
+        return getattr(meta, 'columns', None) or None
+
+    @staticmethod
+    def _get_table_name(model) -> str:
+        """
+        Return the database table name for a model class, model instance or table name string.
+        """
+        if isinstance(model, str):
+            return model
+        try:
+            return model.Meta.db_table
+        except AttributeError:
+            raise TypeError('expected a model or a table name, got {0}'.format(type(model).__name__))
+
+    def get_schema(self, db_conn: BaseDBConnection, model) -> TableSchema:
+        """
+        Return the cached schema for a table, introspecting the table the first time it is seen.
+        :param db_conn: Database connection object, may be None if the model has a column spec.
+        :param model: Model class, model instance or table name.
+        :return: TableSchema object
+        """
+        db_table = self._get_table_name(model)
+
+        # Trust a model column spec over the live database table.
+        spec = self.get_spec(model)
+        if spec:
+            schema = self._specs.get(model.Meta)
+            if schema is None:
+                schema = TableSchema.from_spec(db_table, spec)
+                with self._lock:
+                    schema = self._specs.setdefault(model.Meta, schema)
+            return schema
+
+        identity = db_conn.db_identity()
+        key = (identity, db_table)
+
+        schema = self._schemas.get(key)
+        if schema is not None:
+            return schema
+
+        # Record the fingerprint before introspecting, so check() notices any later change to the table.
+        if identity not in self._fingerprints:
+            self._fingerprints[identity] = self._get_fingerprint(db_conn)
+            self._last_check[identity] = time.monotonic()
+
+        schema = TableSchema.from_spec(db_table, db_conn.db_get_table_spec(db_table))
+
+        with self._lock:
+            # Another thread may have introspected the same table while we were.
+            return self._schemas.setdefault(key, schema)
+
+    def get_columns(self, db_conn: BaseDBConnection, model) -> tuple:
+        """
+        Return the ordered column names of a table.
+        :param db_conn: Database connection object.
+        :param model: Model class, model instance or table name.
+        :return: tuple of column names
+        """
+        return self.get_schema(db_conn, model).columns
+
+    def warm(self, db_conn: BaseDBConnection, *models) -> int:
+        """
+        Introspect and cache the schemas for the given models ahead of time.
+        :param db_conn: Database connection object.
+        :param models: Model classes, model instances or table names.
+        :return: Number of schemas cached.
+        """
+        for model in models:
+            self.get_schema(db_conn, model)
+        return len(models)
+
+    def clear(self, db_conn: BaseDBConnection = None, model=None):
+        """
+        Remove cached schemas. With no arguments the whole cache is cleared.
+        :param db_conn: Only clear schemas for this database connection.
+        :param model: Only clear the schema for this model class, model instance or table name.
+        """
+        identity = db_conn.db_identity() if db_conn is not None else None
+        db_table = self._get_table_name(model) if model is not None else None
+
+        with self._lock:
+            for key in list(self._schemas.keys()):
+                if identity is not None and key[0] != identity:
+                    continue
+                if db_table is not None and key[1] != db_table:
+                    continue
+                del self._schemas[key]
+            if identity is not None and db_table is None:
+                self._fingerprints.pop(identity, None)
+                self._last_check.pop(identity, None)
+            if db_conn is None and db_table is None:
+                self._specs.clear()
+                self._fingerprints.clear()
+                self._last_check.clear()
+
+    def add_listener(self, callback):
+        """
+        Register a callback to be called when a cached table schema is invalidated.
+        :param callback: Function called with the connection identity and table name.
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        """
+        Remove a callback registered with add_listener.
+        :param callback: Registered callback function.
+        """
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def invalidate(self, db_conn: BaseDBConnection, *tables):
+        """
+        Drop the cached schemas for the given tables and notify the listeners.
+        :param db_conn: Database connection object.
+        :param tables: Table names, if empty all tables for this database are invalidated.
+        """
+        identity = db_conn.db_identity()
+
+        with self._lock:
+            if not tables:
+                tables = [key[1] for key in self._schemas if key[0] == identity]
+            for table in tables:
+                self._schemas.pop((identity, table), None)
+
+        for table in tables:
+            for callback in self._listeners:
+                callback(identity, table)
+
+    @staticmethod
+    def _get_fingerprint(db_conn: BaseDBConnection) -> dict:
+        """
+        Return the schema fingerprint of a database, or None if the provider does not support it.
+        """
+        try:
+            return db_conn.db_get_schema_fingerprint()
+        except NotImplementedError:
+            return None
+
+    def check(self, db_conn: BaseDBConnection, force: bool = False) -> list:
+        """
+        Compare the database schema fingerprint with the one recorded when its tables were introspected
+        and invalidate the cached schemas of changed tables. Databases without introspected schemas are
+        not queried, otherwise the database is only queried once per check_interval.
+        :param db_conn: Database connection object.
+        :param force: Ignore check_interval and check now.
+        :return: list of changed table names
+        """
+        identity = db_conn.db_identity()
+
+        previous = self._fingerprints.get(identity)
+        if previous is None or not any(key[0] == identity for key in list(self._schemas)):
+            return list()
+
+        now = time.monotonic()
+
+        last_check = self._last_check.get(identity)
+        if not force and last_check is not None and now - last_check < self.check_interval:
+            return list()
+        self._last_check[identity] = now
+
+        current = self._get_fingerprint(db_conn)
+        self._fingerprints[identity] = current
+
+        if current is None or previous == current:
+            return list()
+
+        # A database wide fingerprint is stored with the None key and covers every table.
+        if None in current:
+            changed = [key[1] for key in list(self._schemas) if key[0] == identity]
+        else:
+            changed = [table for table in set(previous) | set(current) if previous.get(table) != current.get(table)]
+
+        if changed:
+            self.invalidate(db_conn, *changed)
+
+        return changed
+
+    def __len__(self):
+        return len(self._schemas)
+
+    def __contains__(self, key):
+        return key in self._schemas
+
+
+# Shared schema registry used by all models.
+schema_registry = SchemaRegistry()
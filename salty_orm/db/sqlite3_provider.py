@@ -5,21 +5,35 @@
 # Copyright (c) 2018 Robert Abram - All Rights Reserved.
 #
 
+import collections.abc
 import os
 import sqlite3
 
 from salty_orm.db.base_provider import BaseDBConnection, NotConnectedError, ConnectionFailedError, \
-    ExecStatementFailedError, InvalidStatementError
+    ExecStatementFailedError, InvalidStatementError, StatementCache, fetch_chunks
+from salty_orm.db.explain import QueryPlan, parse_sqlite_plan
+from salty_orm.db.schema import Column, py_type_from_decl
 
 
-def dict_factory(cursor, row):
+def stmt_args(args) -> tuple:
     """
-    Use for the sqlite connection row_factory function so we can lookup row data by field name.
+    Convert statement arguments given as a dict, list or None to the tuple sqlite expects.
     """
-    d = {}
-    for idx, col in enumerate(cursor.description):
-        d[col[0]] = row[idx]
-    return d
+    if not args:
+        return tuple()
+    if isinstance(args, collections.abc.Mapping):
+        return tuple(args.values())
+    return tuple(args)
+
+
+def is_locked_error(error) -> bool:
+    """
+    Return True if a sqlite error is SQLITE_LOCKED, IE: a table is in use by another statement.
+    """
+    code = getattr(error, 'sqlite_errorcode', None)
+    if code is not None:
+        return code & 0xff == sqlite3.SQLITE_LOCKED
+    return 'table is locked' in str(error)
 
 
 class SqliteDBConnection(BaseDBConnection):
@@ -28,15 +42,17 @@ class SqliteDBConnection(BaseDBConnection):
     """
 
     _db_path = None  # Path to sqlite3 database
+    _pending_value_tables = None  # Value tables that could not be dropped while a statement was reading
     provider = 'sqlite3'
 
     def __del__(self):
         self.db_close()
 
-    def db_connect(self, alt_db_path=None) -> bool:
+    def db_connect(self, alt_db_path=None, cached_statements: int = 128) -> bool:
         """
         Connect to a local sqlite3 database
         :param alt_db_path: Alternate database path to use besides hardcoded path
+        :param cached_statements: Number of prepared statements sqlite keeps for reuse
         :return: True if connected otherwise False
         """
         db_path = self._db_path
@@ -46,12 +62,16 @@ class SqliteDBConnection(BaseDBConnection):
 
         if os.path.exists(db_path):
             self._db_path = db_path
+            self._identity = '{0}:{1}'.format(self.provider, os.path.abspath(db_path))
         else:
             raise FileNotFoundError('database path not found ({0})'.format(db_path))
 
         try:
-            self._handle = sqlite3.connect(db_path)
-            self._handle.row_factory = dict_factory
+            self._handle = sqlite3.connect(db_path, cached_statements=cached_statements)
+            self._cursor = None
+
+            # sqlite prepares and caches the statements itself, track the same statements for the hit rate.
+            self._statements = StatementCache(cached_statements)
             self._connected = True
             return True
 
@@ -64,10 +84,23 @@ class SqliteDBConnection(BaseDBConnection):
         """
 
         if self._connected and self._handle:
+            if self._cursor is not None:
+                self._cursor.close()
             self._handle.close()
 
         self._connected = False
         self._handle = None
+        self._cursor = None
+        self._pending_value_tables = None
+
+    def _get_cursor(self):
+        """
+        Return the reusable cursor, creating it the first time. It returns plain row tuples.
+        """
+        if self._cursor is None:
+            self._cursor = self._handle.cursor()
+            self._cursor.row_factory = None
+        return self._cursor
 
     def db_connected(self) -> bool:
         """
@@ -97,16 +130,16 @@ class SqliteDBConnection(BaseDBConnection):
 
         return True
 
-    def db_exec(self, stmt: str, args: dict=None) -> bool:
+    def db_exec(self, stmt: str, args: dict=None, commit: bool = True) -> bool:
 
         if self.db_connected() is False:
             raise NotConnectedError("not connected to a database")
 
         try:
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, tuple(args.values()))
-            cursor.close()
-            self._handle.commit()
+            cursor = self._get_cursor()
+            cursor.execute(self._prepare_stmt(stmt), stmt_args(args))
+            if commit:
+                self._handle.commit()
 
         except Exception as e:
             raise ExecStatementFailedError(e)
@@ -128,12 +161,40 @@ class SqliteDBConnection(BaseDBConnection):
 
         return True
 
+    def db_rollback(self) -> bool:
+        """
+        Call database rollback
+        """
+        if self.db_connected() is False:
+            raise NotConnectedError("not connected to a database")
+
+        try:
+            self._handle.rollback()
+
+        except Exception as e:
+            raise ExecStatementFailedError(e)
+
+        return True
+
     def db_exec_stmt(self, stmt: str, args: dict=None) -> dict:
         """
         Execute a select statement
         :param stmt: sql statement
         :param args: argument list
-        :return: sqlite cursor or none
+        :return: list of row dicts
+        """
+        columns, rows = self.db_exec_stmt_rows(stmt, args)
+
+        # The column names are looked up once per statement, not once per row.
+        return [dict(zip(columns, row)) for row in rows]
+
+    def db_exec_stmt_rows(self, stmt: str, args: dict=None, chunk_size: int=None) -> (tuple, list):
+        """
+        Execute a select statement and return the column names and the row tuples
+        :param stmt: sql statement
+        :param args: argument list
+        :param chunk_size: if set, return a generator that fetches chunk_size rows at a time instead of a list
+        :return: column name tuple, rows
         """
         if self.db_connected() is False:
             raise NotConnectedError("not connected to a database")
@@ -143,17 +204,101 @@ class SqliteDBConnection(BaseDBConnection):
 
         try:
 
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, tuple(args.values()))
+            # A streaming cursor stays open while the rows are read, so it can not be the shared cursor.
+            if chunk_size:
+                cursor = self._handle.cursor()
+                cursor.row_factory = None
+            else:
+                cursor = self._get_cursor()
 
-            data = cursor.fetchall()
-            cursor.close()
+            cursor.execute(self._prepare_stmt(stmt), stmt_args(args))
 
-            return data
+            columns = tuple(col[0] for col in cursor.description) if cursor.description else tuple()
+
+            if chunk_size:
+                return columns, fetch_chunks(cursor, chunk_size)
+
+            return columns, cursor.fetchall()
+
+        except Exception as e:
+            raise ExecStatementFailedError(e)
+
+    def db_exec_many(self, stmt: str, args_list: list, commit: bool = True) -> int:
+        """
+        Execute a sql statement once for each argument list and commit
+        :param stmt: sql statement
+        :param args_list: list of argument dicts or lists
+        :param commit: commit after the statements, otherwise the caller commits or rolls back
+        :return: number of rows changed
+        """
+        if self.db_connected() is False:
+            raise NotConnectedError("not connected to a database")
+
+        if not stmt:
+            raise InvalidStatementError('sql statement is missing')
+
+        try:
+            cursor = self._get_cursor()
+            cursor.executemany(self._prepare_stmt(stmt), (stmt_args(args) for args in args_list))
+            if commit:
+                self._handle.commit()
+
+            return cursor.rowcount
 
         except Exception as e:
             raise ExecStatementFailedError(e)
 
+    def db_last_insert_ids(self, count: int) -> list:
+        """
+        Return the rowids of the last count inserted rows. Rows inserted in one write transaction
+        without explicit ids get consecutive rowids.
+        :param count: number of rows inserted by the last statement
+        :return: list of rowids
+        """
+        cursor = self._get_cursor()
+        cursor.execute('SELECT last_insert_rowid()')
+        last = cursor.fetchone()[0]
+
+        return list(range(last - count + 1, last + 1))
+
+    def db_create_value_table(self, values: list) -> str:
+        """
+        Create a temporary table with a single 'value' column holding the given values. Without an open
+        transaction the table is written in autocommit mode, so reading does not leave a transaction open.
+        :param values: list of values
+        :return: table name
+        """
+        if self._handle is None or self._handle.in_transaction:
+            return super(SqliteDBConnection, self).db_create_value_table(values)
+
+        isolation_level = self._handle.isolation_level
+        self._handle.isolation_level = None
+
+        try:
+            return super(SqliteDBConnection, self).db_create_value_table(values)
+        finally:
+            self._handle.isolation_level = isolation_level
+
+    def db_drop_value_table(self, name: str):
+        """
+        Drop a temporary table created by db_create_value_table. Sqlite can not drop tables while another
+        statement is reading, those tables are dropped by a later call instead.
+        :param name: table name
+        """
+        if self._pending_value_tables is None:
+            self._pending_value_tables = list()
+
+        names = self._pending_value_tables + [name]
+        self._pending_value_tables = list()
+
+        for name in names:
+            try:
+                self.db_exec('DROP TABLE IF EXISTS temp.{0}'.format(name), commit=False)
+            except ExecStatementFailedError as e:
+                if not is_locked_error(e.message):
+                    raise
+                self._pending_value_tables.append(name)
+
     def db_exec_select_by_id_all(self, table: str, pk: int) -> dict:
 
         if self.db_connected() is False:
@@ -177,11 +322,10 @@ class SqliteDBConnection(BaseDBConnection):
 
         try:
 
-            cursor = self._handle.cursor()
-            cursor.execute(stmt, tuple(args.values()))
+            cursor = self._get_cursor()
+            cursor.execute(self._prepare_stmt(stmt), stmt_args(args))
             lastrowid = cursor.lastrowid
             self._handle.commit()
-            cursor.close()
 
             return lastrowid if lastrowid else 1
 
@@ -235,6 +379,52 @@ class SqliteDBConnection(BaseDBConnection):
 
         return 0
 
+    def db_get_table_spec(self, table: str) -> list:
+        """ return an ordered list of Column objects describing a table """
+
+        spec = list()
+        data = self.db_exec_stmt('PRAGMA table_info("{0}")'.format(table))
+
+        if data:
+            for row in data:
+                spec.append(Column(row['name'], py_type_from_decl(row['type']), null=not row['notnull'],
+                                   primary_key=bool(row['pk'])))
+
+        return spec
+
+    def db_get_table_indexes(self, table: str) -> dict:
+        """ return a dict of index name to the ordered column names of each index of a table """
+
+        indexes = dict()
+
+        # An INTEGER PRIMARY KEY is the rowid and is not listed as an index.
+        primary = [col.name for col in self.db_get_table_spec(table) if col.primary_key]
+        if primary:
+            indexes['PRIMARY'] = primary
+
+        for index in self.db_exec_stmt('PRAGMA index_list("{0}")'.format(table)) or list():
+            data = self.db_exec_stmt('PRAGMA index_info("{0}")'.format(index['name']))
+            indexes[index['name']] = [row['name'] for row in sorted(data, key=lambda row: row['seqno'])]
+
+        return indexes
+
+    def db_get_schema_fingerprint(self) -> dict:
+        """ return the database wide schema version, it is incremented by every schema change """
+
+        data = self.db_exec_stmt('PRAGMA schema_version')
+
+        if data:
+            return {None: data[0]['schema_version']}
+
+        return {None: 0}
+
+    def db_explain(self, stmt: str, args: dict=None) -> QueryPlan:
+        """ return the parsed EXPLAIN QUERY PLAN of a sql statement """
+
+        columns, rows = self.db_exec_stmt_rows('EXPLAIN QUERY PLAN {0}'.format(stmt), args)
+
+        return parse_sqlite_plan(stmt, rows)
+
     def db_get_record_info(self, fields, table: str, pk: int):
         """ get the id, created and modified fields of a table record """
 
@@ -25,18 +25,13 @@ class RulingStatus(IntEnum):
     DOC_DOWNLOADED = 10
 
 
-# loop until there are no documents that need downloading
-while True:
+# Walk the rulings that need downloading 10 records at a time
+rulings = RulingModel(dbconn).objects. \
+    filter(Q('status', QOper.O_LT, RulingStatus.DOC_DOWNLOADED.value))
 
-    # Only grab 10 records at a time
-    rulings = RulingModel(dbconn).objects. \
-        filter(Q('status', QOper.O_LT, RulingStatus.DOC_DOWNLOADED.value, placeholder=dbconn.placeholder)). \
-        limit(10)
+for page in rulings.paginate_by_key('id', page_size=10):
 
-    if not rulings or len(rulings) == 0:
-        break
-
-    for ruling in rulings:
+    for ruling in page:
         print("downloading: {0}".format(ruling.ruling_no))
 
         # Download...
@@ -34,6 +34,25 @@ def setup_unicode():
     gettext.install('sys_update', **kwargs)
 
 
+def column_spec(field, name, mapping):
+    """
+    Return the source code of a salty_orm Column definition for a Django model field.
+    :param field: Django model field.
+    :param name: Database column name, also the Salty-ORM model field name.
+    :param mapping: Python type name of the field values.
+    :return: Column definition string.
+    """
+    py_type = mapping if mapping != 'unknown' else 'None'
+
+    spec = 'Column({0!r}, {1}'.format(name, py_type)
+    if not field.null:
+        spec += ', null=False'
+    if field.primary_key:
+        spec += ', primary_key=True'
+
+    return spec + ')'
+
+
 def clone_models(apps, project, app_folder, out_file):
     """
     Scan the app folder for Django models and write them to the file
@@ -83,7 +102,8 @@ def clone_models(apps, project, app_folder, out_file):
 #
 
 from datetime import datetime, date
-from salty_orm.db.query import BaseUtilityModel    
+from salty_orm.db.query import BaseTableModel
+from salty_orm.db.schema import Column
     """.format(datetime.datetime.now().isoformat()))
 
         for name in app_list:
@@ -100,15 +120,14 @@ from salty_orm.db.query import BaseUtilityModel
                 else:
                     handle.write('\n\n')
 
-                handle.write('class {0}(BaseUtilityModel):\n    """ {1}.apps.{2}.models.{0} """\n'.
+                handle.write('class {0}(BaseTableModel):\n    """ {1}.apps.{2}.models.{0} """\n'.
                              format(model._meta.object_name, project, name))
 
                 # print('Model: {0}, Table: {1}'.format(model._meta.object_name, model._meta.db_table))
 
-                for field in model._meta.fields:
+                columns = list()
 
-                    if field.name in ('id', 'created', 'modified'):  # BaseModel fields
-                        continue
+                for field in model._meta.fields:
 
                     internal_type = field.get_internal_type()
 
@@ -127,10 +146,22 @@ from salty_orm.db.query import BaseUtilityModel
                     if hasattr(field, 'alt_name'):
                         name = field.alt_name
 
+                    # Rows are loaded by database column name, IE: a field with a custom db_column.
+                    name = getattr(field, 'column', None) or name
+
+                    columns.append(column_spec(field, name, mapping))
+
+                    if field.name in ('id', 'created', 'modified'):  # BaseModel fields
+                        continue
+
                     handle.write('    {0} = None  # type: {1}\n'.format(name, mapping))
                     # print('   Field: {0}, Type: {1}, Map: {2}'.format(field.name, field.get_internal_type(), mapping))
 
                 handle.write("\n    class Meta:\n        db_table = '{0}'\n".format(model._meta.db_table))
+                handle.write("        columns = (\n")
+                for column in columns:
+                    handle.write("            {0},\n".format(column))
+                handle.write("        )\n")
 
             handle.write('# -- End app.{0} models -- #\n'.format(name))
 
@@ -0,0 +1,125 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import unittest
+from datetime import datetime
+
+from salty_orm.db.mysql_provider import MySQLDBConnection
+from salty_orm.db.query import BaseTableModel
+from salty_orm.db.schema import Column
+
+
+class SpecRulingModel(BaseTableModel):
+
+    id = None  # type: int
+    cross_id = None  # type: int
+    status = None  # type: int
+
+    class Meta:
+        db_table = 'test_model'
+        columns = (
+            Column('id', int, null=False, primary_key=True),
+            Column('created', datetime),
+            Column('modified', datetime),
+            Column('cross_id', int),
+            Column('status', int),
+        )
+
+
+class RecordingCursor(object):
+    """
+    Cursor that records the statements it is given. Like MySQLdb it only accepts str queries, and no
+    statement can run while an unbuffered cursor has unread rows.
+    """
+
+    description = None
+    lastrowid = 0
+    rowcount = 0
+
+    def __init__(self, handle, unbuffered: bool = False):
+        self.handle = handle
+        self.unbuffered = unbuffered
+        self.rows = list()
+
+    def _start(self, query):
+        if not isinstance(query, str):
+            raise TypeError('query must be a str')
+        if self.handle.unread is not None:
+            raise Exception("(2014, \"Commands out of sync; you can't run this command now\")")
+
+    def execute(self, query, args=None):
+        self._start(query)
+        self.handle.calls.append(('execute', query, args))
+
+        self.description, self.rows = None, list()
+        for prefix, (columns, rows) in self.handle.results.items():
+            if query.startswith(prefix):
+                self.description = tuple((col,) for col in columns)
+                self.rows = list(rows)
+
+        if self.unbuffered and self.rows:
+            self.handle.unread = self
+        return 0
+
+    def executemany(self, query, args):
+        self._start(query)
+        args = list(args)
+        self.handle.calls.append(('executemany', query, args))
+        return len(args)
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        if not rows and self.handle.unread is self:
+            self.handle.unread = None
+        return rows
+
+    def fetchall(self):
+        rows, self.rows = self.rows, list()
+        if self.handle.unread is self:
+            self.handle.unread = None
+        return tuple(rows)
+
+    def close(self):
+        if self.handle.unread is self:
+            self.handle.unread = None
+
+
+class RecordingHandle(object):
+    """
+    MySQLdb connection stand in handing out recording cursors. Statements starting with a key of
+    results return its (column names, rows) value.
+    """
+
+    def __init__(self):
+        self.calls = list()
+        self.results = dict()
+        self.unread = None
+
+    def cursor(self, cursor_class=None):
+        return RecordingCursor(self, unbuffered=cursor_class is not None)
+
+    def commit(self):
+        self.calls.append(('commit',))
+
+    def rollback(self):
+        self.calls.append(('rollback',))
+
+    def close(self):
+        pass
+
+
+class RecordingTestCase(unittest.TestCase):
+    """ MySQL connection on a recording handle, the statements are kept in self._handle.calls """
+
+    _provider = None  # type: MySQLDBConnection
+    _handle = None  # type: RecordingHandle
+
+    def setUp(self) -> None:
+        self._provider = MySQLDBConnection(testing=True)
+        self._handle = RecordingHandle()
+        self._provider._handle = self._handle
+        self._provider._connected = True
+        return super(RecordingTestCase, self).setUp()
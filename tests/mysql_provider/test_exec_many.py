@@ -0,0 +1,59 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.query import Q, QOper
+from tests.mysql_provider.helpers import RecordingTestCase, SpecRulingModel
+
+
+class TestExecMany(RecordingTestCase):
+
+    def executemany_calls(self) -> list:
+        return [call for call in self._handle.calls if call[0] == 'executemany']
+
+    def test_value_table(self):
+        """ Test a large IN list fills a temporary value table with executemany and does not commit """
+        self._provider.max_in_values = 2
+
+        SpecRulingModel(self._provider).objects.filter(Q('id', QOper.O_IN, 1, 2, 3)).count()
+
+        calls = self.executemany_calls()
+        self.assertEqual(len(calls), 1)
+        self.assertRegex(calls[0][1], r'^INSERT INTO _salty_values_\d+ \(value\) VALUES \(%s\)$')
+        self.assertEqual(calls[0][2], [(1,), (2,), (3,)])
+        self.assertNotIn(('commit',), self._handle.calls)
+
+    def test_bulk_create(self):
+        """ Test bulk_create() inserts each batch with executemany and commits once """
+        records = [SpecRulingModel(self._provider, cross_id=x, status=1) for x in range(3)]
+
+        SpecRulingModel(self._provider).objects.bulk_create(records, batch_size=2)
+
+        calls = self.executemany_calls()
+        self.assertEqual([len(call[2]) for call in calls], [2, 1])
+        self.assertTrue(calls[0][1].startswith('INSERT INTO test_model ('))
+        self.assertEqual(self._handle.calls[-1], ('commit',))
+
+    def test_bulk_update_case(self):
+        """ Test bulk_update() sends one UPDATE ... CASE statement per batch """
+        records = [SpecRulingModel(self._provider, id=x, cross_id=x, status=1) for x in range(1, 4)]
+
+        SpecRulingModel(self._provider).objects.bulk_update(records, ['status'], batch_size=2)
+
+        calls = self.executemany_calls()
+        self.assertEqual(len(calls), 2)
+        self.assertIn('`status` = CASE `id` WHEN %s THEN %s', calls[0][1])
+        self.assertEqual(len(calls[0][2]), 1)
+        self.assertEqual(self._handle.calls[-1], ('commit',))
+
+    def test_update(self):
+        """ Test QuerySet.update() sends a single UPDATE statement """
+        SpecRulingModel(self._provider).objects.filter(status=1).update(status=2)
+
+        calls = self.executemany_calls()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(calls[0][1], 'UPDATE test_model SET `status` = %s, `modified` = %s WHERE status = %s')
+        self.assertEqual(calls[0][2][0][0], 2)
+        self.assertEqual(calls[0][2][0][2], 1)
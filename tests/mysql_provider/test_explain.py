@@ -0,0 +1,41 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import unittest
+
+from salty_orm.db.explain import parse_mysql_plan
+
+PLAN_JSON = """
+{
+  "query_block": {
+    "select_id": 1,
+    "ordering_operation": {
+      "using_filesort": true,
+      "nested_loop": [
+        {"table": {"table_name": "test_model", "access_type": "ALL", "rows_examined_per_scan": 1200,
+                   "attached_condition": "(`rulings`.`test_model`.`status` = 1)"}},
+        {"table": {"table_name": "ruling_tariff", "access_type": "ref", "key": "idx_ruling"}}
+      ]
+    }
+  }
+}
+"""
+
+
+class TestMySQLExplain(unittest.TestCase):
+
+    def test_parse_json_plan(self):
+        """ Test parsing an EXPLAIN FORMAT=JSON document into plan nodes """
+        plan = parse_mysql_plan('SELECT ...', PLAN_JSON)
+
+        self.assertTrue(plan.has_filesort)
+        self.assertEqual(plan.full_scans, ['test_model'])
+        self.assertFalse(plan.has_temp_btree)
+
+        order = plan.nodes[0]
+        self.assertEqual(order.detail, 'ORDER BY')
+        self.assertEqual([(n.table, n.access, n.index) for n in order.children],
+                         [('test_model', 'ALL', None), ('ruling_tariff', 'ref', 'idx_ruling')])
@@ -0,0 +1,39 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import datetime
+
+from salty_orm.db.schema import schema_registry
+from salty_orm.examples.models import RulingModel
+from tests.mysql_provider.helpers import RecordingTestCase
+
+SHOW_COLUMNS = (
+    ('Field', 'Type', 'Null', 'Key'),
+    [('id', 'int(11)', 'NO', 'PRI'), ('modified', 'datetime', 'YES', ''), ('status', 'int(11)', 'YES', '')],
+)
+
+
+class TestIterator(RecordingTestCase):
+
+    def setUp(self) -> None:
+        super(TestIterator, self).setUp()
+        self._provider.testing = False
+        self._handle.results['SHOW COLUMNS'] = SHOW_COLUMNS
+        self._handle.results['SELECT * FROM test_model'] = (
+            ('id', 'modified', 'status'), [(x, '2019-01-02 03:04:05', 1) for x in range(1, 6)])
+        schema_registry.clear()
+        self.addCleanup(schema_registry.clear)
+
+    def test_iterator_cold_schema(self):
+        """ Test streaming a table with no cached schema introspects it before the unbuffered cursor opens """
+        records = list(RulingModel.objects.using(self._provider).iterator(chunk_size=2))
+
+        self.assertEqual([r.id for r in records], [1, 2, 3, 4, 5])
+        self.assertEqual(records[0].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
+
+        statements = [call[1] for call in self._handle.calls if call[0] == 'execute']
+        self.assertEqual(statements[-1], 'SELECT * FROM test_model')
+        self.assertIsNone(self._handle.unread)
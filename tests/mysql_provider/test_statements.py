@@ -0,0 +1,23 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from tests.mysql_provider.helpers import RecordingTestCase
+
+
+class TestStatements(RecordingTestCase):
+
+    def test_statements_passed_as_str(self):
+        """ Test statements reach the MySQLdb cursor as str """
+        self._provider.db_exec_stmt('SELECT * FROM test_model WHERE id = %s', [1])
+        self._provider.db_exec_commit('UPDATE test_model SET status = %s', [2])
+
+        self.assertEqual(self._handle.calls[0], ('execute', 'SELECT * FROM test_model WHERE id = %s', [1]))
+        self.assertEqual(self._handle.calls[1], ('execute', 'UPDATE test_model SET status = %s', [2]))
+
+    def test_no_statement_stats(self):
+        """ Test MySQL does not report a prepared statement hit rate """
+        self._provider.db_exec_stmt('SELECT 1')
+        self.assertIsNone(self._provider.db_statement_stats())
@@ -0,0 +1,89 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from salty_orm.db.schema import schema_registry
+from salty_orm.db.sqlite3_provider import SqliteDBConnection
+from salty_orm.examples.models import RulingModel
+
+RULING_TABLE_DDL = """
+    CREATE TABLE test_model (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created datetime,
+        modified datetime,
+        cross_id integer,
+        ruling_no varchar(20),
+        subject text,
+        categories text,
+        ruling_dt datetime,
+        is_nafta integer,
+        collection text,
+        related_rulings text,
+        modified_by text,
+        modifies text,
+        revoked_by text,
+        revokes text,
+        tariffs text,
+        status integer
+    )
+"""
+
+
+class CountingSqliteDBConnection(SqliteDBConnection):
+    """ Sqlite connection that records every statement executed """
+
+    statements = None  # type: list
+
+    def db_exec_stmt_rows(self, stmt: str, args: dict=None, chunk_size: int=None) -> (tuple, list):
+        if self.statements is None:
+            self.statements = list()
+        self.statements.append(stmt)
+        return super(CountingSqliteDBConnection, self).db_exec_stmt_rows(stmt, args, chunk_size)
+
+
+class SqliteTestCase(unittest.TestCase):
+    """ Create a temporary sqlite database holding the test_model table """
+
+    _provider = None  # type: CountingSqliteDBConnection
+    _db_path = None  # type: str
+
+    def setUp(self) -> None:
+        handle, self._db_path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+
+        conn = sqlite3.connect(self._db_path)
+        conn.execute(RULING_TABLE_DDL)
+        conn.commit()
+        conn.close()
+
+        schema_registry.clear()
+
+        self._provider = CountingSqliteDBConnection()
+        self._provider.db_connect(self._db_path)
+        return super(SqliteTestCase, self).setUp()
+
+    def tearDown(self) -> None:
+        self._provider.db_close()
+        schema_registry.clear()
+        os.remove(self._db_path)
+        return super(SqliteTestCase, self).tearDown()
+
+    def insert_rulings(self, count: int, status: int = 1):
+        """ Insert test records directly with sqlite """
+        conn = sqlite3.connect(self._db_path)
+        conn.executemany(
+            "INSERT INTO test_model (created, modified, cross_id, ruling_no, subject, status) "
+            "VALUES ('2019-01-02 03:04:05', '2019-01-02 03:04:05', ?, ?, ?, ?)",
+            [(x, 'R{0:05d}'.format(x), 'subject {0}'.format(x), status) for x in range(1, count + 1)])
+        conn.commit()
+        conn.close()
+
+    def model(self) -> RulingModel:
+        return RulingModel(self._provider)
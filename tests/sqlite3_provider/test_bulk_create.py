@@ -0,0 +1,76 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import sqlite3
+
+from salty_orm.db.base_provider import ExecStatementFailedError
+from salty_orm.db.schema import schema_registry
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestBulkCreate(SqliteTestCase):
+
+    def rulings(self, count: int, start: int = 1) -> list:
+        return [RulingModel(self._provider, cross_id=x, ruling_no='R{0:05d}'.format(x), status=1)
+                for x in range(start, start + count)]
+
+    def test_bulk_create(self):
+        """ Test objects are inserted in batches and get their generated ids """
+        self.insert_rulings(2)
+
+        created = RulingModel.objects.bulk_create(self.rulings(5, start=3), batch_size=2)
+
+        self.assertEqual([obj.id for obj in created], [3, 4, 5, 6, 7])
+        self.assertEqual(created[0].created, created[1].created)
+        self.assertIsNotNone(created[4].modified)
+
+        saved = self.model().objects.get(id=7)
+        self.assertEqual((saved.ruling_no, saved.cross_id), ('R00007', 7))
+        self.assertEqual(self.model().objects.count(), 7)
+
+    def test_bulk_create_rolls_back(self):
+        """ Test a failing batch rolls back all the batches """
+        rulings = self.rulings(3)
+        for obj, pk in zip(rulings, (1, 2, 1)):
+            obj.id = pk
+
+        with self.assertRaises(ExecStatementFailedError):
+            self.model().objects.bulk_create(rulings, batch_size=2)
+
+        self.assertEqual(self.model().objects.count(), 0)
+
+    def test_bulk_create_keeps_ids(self):
+        """ Test objects with their own ids keep them """
+        rulings = self.rulings(2)
+        rulings[0].id = 10
+        rulings[1].id = 20
+
+        self.model().objects.bulk_create(rulings)
+
+        self.assertEqual(list(self.model().objects.values_list('id', flat=True).order_by('id')), [10, 20])
+
+    def test_bulk_create_mixed_ids(self):
+        """ Test objects without ids get generated ids when mixed with objects that have ids """
+        rulings = self.rulings(4)
+        rulings[1].id = 10
+
+        self.model().objects.bulk_create(rulings, batch_size=2)
+
+        self.assertEqual([obj.id for obj in rulings], [1, 10, 2, 3])
+        self.assertEqual(list(self.model().objects.values_list('id', flat=True).order_by('id')), [1, 2, 3, 10])
+
+    def test_bulk_create_column_defaults(self):
+        """ Test unset fields are left out of the insert and get their column defaults """
+        conn = sqlite3.connect(self._db_path)
+        conn.execute('ALTER TABLE test_model ADD COLUMN priority integer DEFAULT 5')
+        conn.commit()
+        conn.close()
+        schema_registry.clear()
+
+        self.model().objects.bulk_create(self.rulings(2))
+
+        self.assertEqual(list(self.model().objects.values_list('priority', flat=True)), [5, 5])
@@ -0,0 +1,74 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import datetime
+
+from salty_orm.db.base_provider import ExecStatementFailedError
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestBulkUpdate(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestBulkUpdate, self).setUp()
+        self.insert_rulings(5)
+
+    def check_update(self):
+        rulings = list(self.model().objects.order_by('id'))
+        for obj in rulings:
+            obj.status = 10 + obj.id
+            obj.subject = 'changed'
+        rulings[0].subject = ['a', 'b']
+
+        changed = self.model().objects.bulk_update(rulings[:4], ['status', 'subject'], batch_size=3)
+
+        self.assertEqual(changed, 4)
+        data = list(self.model().objects.order_by('id'))
+        self.assertEqual([r.status for r in data], [11, 12, 13, 14, 1])
+        self.assertEqual([r.subject for r in data][:2], ['a,b', 'changed'])
+        self.assertGreater(data[0].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
+        self.assertEqual(data[4].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_bulk_update_executemany(self):
+        """ Test bulk_update() with an executemany UPDATE per batch """
+        self.check_update()
+
+    def test_bulk_update_case(self):
+        """ Test bulk_update() with one UPDATE ... CASE statement per batch """
+        self._provider.case_bulk_update = True
+        self.check_update()
+
+    def test_bulk_update_validation(self):
+        """ Test bulk_update() argument checks and rollback """
+        rulings = list(self.model().objects.order_by('id'))
+
+        with self.assertRaises(ValueError):
+            self.model().objects.bulk_update(rulings, [])
+        with self.assertRaises(ValueError):
+            self.model().objects.bulk_update(rulings, ['id'])
+
+        with self.assertRaises(ValueError):
+            self.model().objects.bulk_update(rulings, ['no_such_column'])
+
+        for obj in rulings:
+            obj.status = 7
+        rulings[3].status = object()
+        with self.assertRaises(ExecStatementFailedError):
+            self.model().objects.bulk_update(rulings, ['status'], batch_size=2)
+        self.assertEqual(self.model().objects.filter(status=7).count(), 0)
+
+    def test_bulk_update_deferred(self):
+        """ Test bulk_update() accepts objects loaded with only() and still sets modified """
+        rulings = list(self.model().objects.only('status').order_by('id'))
+        for obj in rulings:
+            obj.status = 3
+
+        self.assertEqual(self.model().objects.bulk_update(rulings, ['status', 'subject']), 5)
+
+        data = list(self.model().objects.order_by('id'))
+        self.assertEqual([r.status for r in data], [3] * 5)
+        self.assertEqual(data[0].subject, 'subject 1')
+        self.assertGreater(data[0].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
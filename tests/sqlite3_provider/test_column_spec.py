@@ -0,0 +1,46 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from datetime import datetime
+
+from salty_orm.db.query import BaseTableModel
+from salty_orm.db.schema import Column, schema_registry
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class SpecRulingModel(BaseTableModel):
+
+    id = None  # type: int
+    cross_id = None  # type: int
+    status = None  # type: int
+
+    class Meta:
+        db_table = 'test_model'
+        columns = (
+            Column('id', int, null=False, primary_key=True),
+            Column('created', datetime),
+            Column('modified', datetime),
+            Column('cross_id', int),
+            Column('status', int),
+        )
+
+
+class TestColumnSpec(SqliteTestCase):
+
+    def test_spec_skips_introspection(self):
+        """ Test a model with a column spec never introspects the table """
+        self.insert_rulings(5)
+
+        records = list(SpecRulingModel(self._provider).objects.values_list('id', 'cross_id', 'status'))
+        self.assertEqual(len(records), 5)
+        self.assertFalse([s for s in self._provider.statements if s.startswith('PRAGMA table_info')])
+
+    def test_spec_schema(self):
+        """ Test the schema built from a column spec """
+        schema = schema_registry.get_schema(None, SpecRulingModel)
+        self.assertEqual(schema.columns, ('id', 'created', 'modified', 'cross_id', 'status'))
+        self.assertTrue(schema.spec[0].primary_key)
+        self.assertEqual(SpecRulingModel(None).fields, list(schema.columns))
@@ -0,0 +1,37 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from array import array
+from datetime import datetime
+
+from salty_orm.db.columnar import ColumnarResult
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestColumnar(SqliteTestCase):
+
+    def test_columns(self):
+        """ Test streaming a query into typed columns """
+        self.insert_rulings(25)
+
+        result = self.model().objects.order_by('id').columns('id', 'cross_id', 'created', chunk_size=7)
+        self.assertEqual(len(result), 25)
+        self.assertEqual(result.names, ['id', 'cross_id', 'created'])
+        self.assertIsInstance(result['id'], array)
+        self.assertEqual(sum(result.memoryview('cross_id')), sum(range(1, 26)))
+        self.assertEqual(result['created'][0], datetime(2019, 1, 2, 3, 4, 5))
+        with self.assertRaises(TypeError):
+            result.memoryview('created')
+
+    def test_null_values(self):
+        """ Test a typed column falls back to a list when a null value is found """
+        rows = [{'a': 1, 'b': 1.5}, {'a': None, 'b': 2.5}, {'a': 3, 'b': 3.5}]
+        result = ColumnarResult.from_rows(rows, {'a': int}, chunk_size=2)
+
+        self.assertEqual(result['a'], [1, None, 3])
+        self.assertFalse(result.is_typed('a'))
+        self.assertTrue(result.is_typed('b'))
+        self.assertEqual(list(result['b']), [1.5, 2.5, 3.5])
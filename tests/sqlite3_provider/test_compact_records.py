@@ -0,0 +1,47 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from datetime import datetime
+
+from salty_orm.db.query import BaseTableRecord, ModelError, record_class
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestCompactRecords(SqliteTestCase):
+
+    def test_compact_records(self):
+        """ Test compact() returns slotted records """
+        self.insert_rulings(3)
+
+        records = list(self.model().objects.compact())
+        self.assertEqual(len(records), 3)
+        self.assertIsInstance(records[0], BaseTableRecord)
+        self.assertFalse(hasattr(records[0], '__dict__'))
+        self.assertIs(type(records[0]), type(records[2]))
+        self.assertEqual(records[0].created, datetime(2019, 1, 2, 3, 4, 5))
+        self.assertEqual(records[1].to_dict(cleaned=True)['ruling_no'], 'R00002')
+
+    def test_compact_save_and_delete(self):
+        """ Test saving and deleting a compact record """
+        self.insert_rulings(3)
+
+        record = self.model().objects.values_list('id', 'status').compact().get(id=2)
+        self.assertEqual(record.fields, ('id', 'status'))
+
+        record.status = 10
+        record.save()
+        self.assertEqual(self.model().objects.get(id=2).status, 10)
+        self.assertEqual(self.model().objects.get(id=2).subject, 'subject 2')
+
+        record.delete()
+        self.assertEqual(len(self.model().objects.all()), 2)
+
+    def test_record_class(self):
+        """ Test record classes are cached and column names are checked """
+        self.assertIs(record_class(RulingModel, ['id', 'status']), record_class(RulingModel, ('id', 'status')))
+        with self.assertRaises(ModelError):
+            record_class(RulingModel, ['id', 'count(1)'])
@@ -0,0 +1,59 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import sqlite3
+
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestCount(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestCount, self).setUp()
+        self.insert_rulings(10)
+        conn = sqlite3.connect(self._db_path)
+        conn.execute('UPDATE test_model SET status = 2 WHERE id > 6')
+        conn.commit()
+        conn.close()
+
+    def test_count_honors_filters(self):
+        """ Test count() compiles the filtered query as SELECT COUNT(*) """
+        self.assertEqual(self.model().objects.filter(status=2).count(), 4)
+        self.assertEqual(self._provider.statements[-1], 'SELECT COUNT(*) AS count FROM test_model WHERE status = ?')
+
+        self.assertEqual(self.model().objects.count(), 10)
+
+    def test_count_subquery(self):
+        """ Test distinct, grouped and limited queries are counted as a subquery """
+        self.assertEqual(self.model().objects.values_list('status').distinct().count(), 2)
+        self.assertEqual(self._provider.statements[-1],
+                         'SELECT COUNT(*) AS count FROM (SELECT DISTINCT status FROM test_model) AS count_query')
+
+        self.assertEqual(self.model().objects.values_list('status').group_by('status').count(), 2)
+        self.assertEqual(self.model().objects.filter(Q('id', QOper.O_GT, 3)).limit(5).count(), 5)
+
+    def test_len_and_bool_without_cache(self):
+        """ Test len() and bool() ask the database instead of fetching the rows """
+        queryset = self.model().objects.filter(status=2)
+
+        self.assertEqual(len(queryset), 4)
+        self.assertTrue(queryset)
+        self.assertIsNone(queryset._result_cache)
+        self.assertEqual(self._provider.statements[-1], 'SELECT 1 FROM test_model WHERE status = ? LIMIT 1')
+
+        self.assertFalse(self.model().objects.filter(status=3))
+
+    def test_len_uses_cache(self):
+        """ Test len() and count() use a populated result cache """
+        queryset = self.model().objects.filter(status=1)
+        self.assertEqual(len(list(queryset)), 6)
+        executed = len(self._provider.statements)
+
+        self.assertEqual(len(queryset), 6)
+        self.assertEqual(queryset.count(), 6)
+        self.assertTrue(queryset)
+        self.assertEqual(len(self._provider.statements), executed)
@@ -0,0 +1,63 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import datetime
+
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestDeferredFields(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestDeferredFields, self).setUp()
+        self.insert_rulings(5)
+
+    def test_only_selects_fields(self):
+        """ Test only() selects the given fields and the id, and returns model objects """
+        data = list(self.model().objects.only('ruling_no').order_by('id'))
+
+        self.assertEqual(self._provider.statements[-1], 'SELECT id, ruling_no FROM test_model ORDER BY id')
+        self.assertIsInstance(data[0], RulingModel)
+        self.assertEqual(data[0].fields, ['id', 'ruling_no'])
+        self.assertEqual(data[0].ruling_no, 'R00001')
+        self.assertNotIn('subject', data[0].__dict__)
+
+    def test_deferred_field_loaded_in_one_query(self):
+        """ Test reading a deferred field loads it for every object of the result with one query """
+        data = list(self.model().objects.only('ruling_no').order_by('id'))
+        executed = len(self._provider.statements)
+
+        self.assertEqual(data[2].subject, 'subject 3')
+        self.assertEqual([r.subject for r in data], ['subject {0}'.format(x) for x in range(1, 6)])
+        self.assertEqual(len(self._provider.statements), executed + 1)
+        self.assertEqual(self._provider.statements[-1],
+                         'SELECT id, subject FROM test_model WHERE id IN (?, ?, ?, ?, ?)')
+
+        # Converters apply to deferred fields too.
+        self.assertEqual(data[0].created, datetime.datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_defer(self):
+        """ Test defer() leaves out the given fields """
+        data = list(self.model().objects.defer('subject', 'tariffs'))
+
+        self.assertNotIn('subject', data[0].fields)
+        self.assertIn('ruling_no', data[0].fields)
+        self.assertNotIn('subject,', self._provider.statements[-1])
+        self.assertEqual(data[0].subject, 'subject 1')
+
+        with self.assertRaises(ValueError):
+            self.model().objects.defer('id')
+
+    def test_save_writes_loaded_fields(self):
+        """ Test saving a deferred model only writes the loaded and assigned fields """
+        record = self.model().objects.only('status').get(id=2)
+        record.status = 5
+        record.tariffs = '1234'
+        record.save()
+
+        saved = self.model().objects.get(id=2)
+        self.assertEqual((saved.status, saved.tariffs, saved.subject), (5, '1234', 'subject 2'))
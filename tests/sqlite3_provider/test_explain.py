@@ -0,0 +1,38 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestExplain(SqliteTestCase):
+
+    def test_full_scan_flagged(self):
+        """ Test a filter on a column without an index is a full table scan """
+        plan = self.model().objects.filter(status=1).explain()
+
+        self.assertTrue(plan.has_full_scan)
+        self.assertEqual(plan.full_scans, ['test_model'])
+        self.assertEqual(plan.sql, 'SELECT * FROM test_model WHERE status = ?')
+
+    def test_primary_key_search(self):
+        """ Test a primary key filter searches the table """
+        plan = self.model().objects.filter(Q('id', QOper.O_EQUAL, 3)).explain()
+
+        self.assertFalse(plan.has_full_scan)
+        node = plan.nodes[0]
+        self.assertEqual((node.access, node.table, node.index), ('search', 'test_model', 'PRIMARY KEY'))
+
+    def test_index_and_temp_btree(self):
+        """ Test index searches and sorts without an index """
+        self._provider.db_exec('CREATE INDEX idx_status ON test_model (status)')
+
+        plan = self.model().objects.filter(status=1).order_by('subject').explain()
+
+        self.assertFalse(plan.has_full_scan)
+        self.assertTrue(plan.has_temp_btree)
+        self.assertIn('idx_status', [node.index for node in plan.walk()])
+        self.assertIn('[temp_btree]', str(plan))
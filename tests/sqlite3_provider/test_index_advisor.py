@@ -0,0 +1,66 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.advisor import index_advisor
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestIndexAdvisor(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestIndexAdvisor, self).setUp()
+        self.insert_rulings(5)
+        index_advisor.clear()
+        index_advisor.enable()
+
+    def tearDown(self) -> None:
+        index_advisor.disable()
+        index_advisor.clear()
+        super(TestIndexAdvisor, self).tearDown()
+
+    def test_disabled_records_nothing(self):
+        """ Test queries are not recorded while the advisor is disabled """
+        index_advisor.disable()
+        list(self.model().objects.filter(status=1))
+        self.assertEqual(len(index_advisor), 0)
+
+    def test_missing_index_reported(self):
+        """ Test filter and order by columns are suggested as an index """
+        for x in range(3):
+            list(self.model().objects.filter(Q('status', QOper.O_EQUAL, 1) & Q('cross_id', QOper.O_GT, x)))
+        list(self.model().objects.filter(ruling_no='R00001').order_by('modified DESC'))
+
+        report = index_advisor.report(self._provider)
+
+        self.assertEqual({usage.columns: usage.count for usage in report},
+                         {('status', 'cross_id'): 3, ('ruling_no', 'modified'): 1})
+        self.assertIn('CREATE INDEX idx_test_model_status_cross_id ON test_model (status, cross_id)',
+                      [usage.ddl for usage in report])
+
+    def test_report_ranked_by_total_time(self):
+        """ Test suggestions are ranked by the total time of their queries """
+        where = Q('status', QOper.O_EQUAL, 1)
+        index_advisor.record(self._provider, 'test_model', where, elapsed=0.5)
+        index_advisor.record(self._provider, 'test_model', Q('subject', QOper.O_LIKE, 'a%'), elapsed=0.2)
+        index_advisor.record(self._provider, 'test_model', Q('subject', QOper.O_LIKE, 'b%'), elapsed=0.4)
+
+        report = index_advisor.report(self._provider)
+
+        self.assertEqual([usage.columns for usage in report], [('subject',), ('status',)])
+        self.assertAlmostEqual(report[0].avg_time, 0.3)
+
+    def test_existing_indexes_not_reported(self):
+        """ Test queries served by an existing index or the primary key are not reported """
+        self._provider.db_exec('CREATE INDEX idx_cross_status ON test_model (cross_id, status)')
+
+        list(self.model().objects.filter(status=1, cross_id=2))
+        list(self.model().objects.filter(Q('id', QOper.O_IN, 1, 2)))
+        list(self.model().objects.filter(Q('status', QOper.O_EQUAL, 1) | Q('cross_id', QOper.O_EQUAL, 3)))
+
+        self.assertEqual(index_advisor.report(self._provider), [])
+        self.assertEqual(self._provider.db_get_table_indexes('test_model'),
+                         {'PRIMARY': ['id'], 'idx_cross_status': ['cross_id', 'status']})
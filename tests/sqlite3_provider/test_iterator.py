@@ -0,0 +1,33 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import types
+
+from salty_orm.db.query import Q, QOper
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestIterator(SqliteTestCase):
+
+    def test_iterator(self):
+        """ Test iterator() streams the results without filling the result cache """
+        self.insert_rulings(25)
+
+        queryset = self.model().objects.filter(Q('status', QOper.O_EQUAL, 1))
+        results = queryset.iterator(chunk_size=4)
+        self.assertIsInstance(results, types.GeneratorType)
+
+        records = list(results)
+        self.assertEqual(len(records), 25)
+        self.assertIsInstance(records[0], RulingModel)
+        self.assertEqual([r.id for r in records], list(range(1, 26)))
+        self.assertIsNone(queryset._result_cache)
+
+    def test_iterator_chunk_size(self):
+        """ Test an invalid chunk size """
+        with self.assertRaises(ValueError):
+            self.model().objects.iterator(chunk_size=0)
@@ -0,0 +1,73 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestLargeInList(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestLargeInList, self).setUp()
+        self._provider.max_in_values = 10
+        self.insert_rulings(30)
+
+    def temp_tables(self) -> list:
+        return self._provider.db_exec_stmt("SELECT name FROM sqlite_temp_master WHERE type = 'table'")
+
+    def test_small_in_list_binds_values(self):
+        """ Test IN lists up to max_in_values are bound as arguments """
+        data = list(self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 11))))
+
+        self.assertEqual(len(data), 10)
+        self.assertIn('id IN (?, ?', self._provider.statements[-1])
+
+    def test_large_in_list_uses_value_table(self):
+        """ Test a large IN list selects its values from a temporary table that is dropped afterwards """
+        ids = list(range(5, 26)) + [1000]
+
+        data = list(self.model().objects.filter(Q('id', QOper.O_IN, *ids)).order_by('id'))
+
+        self.assertEqual([r.id for r in data], list(range(5, 26)))
+        self.assertIn('id IN (SELECT value FROM _salty_values_', self._provider.statements[-1])
+        self.assertEqual(self.temp_tables(), [])
+
+    def test_large_not_in_list(self):
+        """ Test a large NOT IN list in a combined where clause """
+        ids = list(range(1, 21))
+
+        data = list(self.model().objects.filter(Q('id', QOper.O_NOT_IN, *ids) & Q('status', QOper.O_EQUAL, 1)))
+
+        self.assertEqual(sorted(r.id for r in data), list(range(21, 31)))
+
+    def test_iterator_with_large_in_list(self):
+        """ Test streaming a result with a large IN list drops the value table when done """
+        rows = self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 16))).iterator(chunk_size=4)
+
+        self.assertEqual(sorted(r.id for r in rows), list(range(1, 16)))
+        self.assertEqual(self.temp_tables(), [])
+
+    def test_large_in_list_while_iterating(self):
+        """ Test a large IN list query while a streamed result is open on the same connection """
+        counts = [self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 16))).count()
+                  for r in self.model().objects.iterator(chunk_size=4)]
+
+        self.assertEqual(counts, [15] * 30)
+
+        # Value tables that were in use are dropped by the next value table query.
+        self.assertEqual(self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 16))).count(), 15)
+        self.assertEqual(self.temp_tables(), [])
+
+    def test_large_in_list_does_not_commit(self):
+        """ Test a large IN list query does not commit an open transaction or leave one open """
+        self.assertEqual(self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 16))).count(), 15)
+        self.assertFalse(self._provider._handle.in_transaction)
+
+        self._provider.db_exec('UPDATE test_model SET status = 2', commit=False)
+        self.assertEqual(self.model().objects.filter(Q('id', QOper.O_IN, *range(1, 16))).count(), 15)
+        self._provider.db_rollback()
+
+        self.assertEqual(self.model().objects.filter(status=2).count(), 0)
@@ -0,0 +1,43 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from datetime import datetime
+
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestLazyFields(SqliteTestCase):
+
+    def test_lazy_access(self):
+        """ Test lazy models only decode the fields that are read """
+        self.insert_rulings(3)
+
+        records = list(self.model().objects.lazy())
+        self.assertEqual(len(records), 3)
+        self.assertIsInstance(records[0], RulingModel)
+
+        record = records[1]
+        self.assertNotIn('subject', record.__dict__)
+        self.assertEqual(record.ruling_no, 'R00002')
+        self.assertIn('ruling_no', record.__dict__)
+        self.assertNotIn('subject', record.__dict__)
+
+        data = record.to_dict()
+        self.assertEqual(data['subject'], 'subject 2')
+        self.assertEqual(data['created'], datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_lazy_save(self):
+        """ Test saving a lazy model writes the decoded and changed fields """
+        self.insert_rulings(2)
+
+        record = self.model().objects.lazy().get(id=2)
+        record.status = 10
+        record.save()
+
+        saved = self.model().objects.get(id=2)
+        self.assertEqual(saved.status, 10)
+        self.assertEqual(saved.subject, 'subject 2')
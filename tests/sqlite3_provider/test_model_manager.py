@@ -0,0 +1,60 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import gc
+import weakref
+
+from salty_orm.db.query import BaseQuerySet, ModelManager, ModelRequired
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import CountingSqliteDBConnection, SqliteTestCase
+
+
+class TestModelManager(SqliteTestCase):
+
+    def test_class_manager(self):
+        """ Test the class manager is bound to a connection with using() """
+        self.insert_rulings(3)
+
+        manager = RulingModel.objects
+        self.assertIsInstance(manager, ModelManager)
+        self.assertIs(manager, RulingModel.objects)
+        self.assertIs(manager.using(self._provider).db_conn, self._provider)
+
+        records = list(RulingModel.objects.using(self._provider).filter(status=1))
+        self.assertEqual(len(records), 3)
+        self.assertIsInstance(RulingModel.objects.using(self._provider).all(), BaseQuerySet)
+
+        with self.assertRaises(ModelRequired):
+            ModelManager().using(self._provider)
+
+    def test_rows_have_no_queryset(self):
+        """ Test model objects do not create their own queryset """
+        self.insert_rulings(2)
+
+        record = RulingModel.objects.using(self._provider).get(id=1)
+        self.assertNotIn('objects', record.__dict__)
+        self.assertIs(record.objects.db_conn, self._provider)
+        self.assertEqual(len(self.model().objects), 2)
+
+    def test_manager_does_not_keep_connection(self):
+        """ Test binding a manager to a connection does not keep the connection alive """
+        db_conn = CountingSqliteDBConnection()
+        db_conn.db_connect(self._db_path)
+        self.assertEqual(RulingModel.objects.using(db_conn).count(), 0)
+
+        ref = weakref.ref(db_conn)
+        del db_conn
+        gc.collect()
+        self.assertIsNone(ref())
+
+    def test_unbound_manager(self):
+        """ Test queries on a manager without a connection raise a clear error """
+        with self.assertRaises(TypeError):
+            RulingModel.objects.count()
+        with self.assertRaises(TypeError):
+            RulingModel.objects.update(status=2)
+        with self.assertRaises(TypeError):
+            RulingModel.objects.explain()
@@ -0,0 +1,55 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import sqlite3
+
+from salty_orm.db.query import ModelFieldRequired, Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestPaginateByKey(SqliteTestCase):
+
+    def test_pages_by_id(self):
+        """ Test pages seek past the last id of the previous page """
+        self.insert_rulings(25)
+
+        pages = [[r.id for r in page] for page in self.model().objects.paginate_by_key('id', page_size=10)]
+
+        self.assertEqual(pages, [list(range(1, 11)), list(range(11, 21)), list(range(21, 26))])
+        self.assertIn('WHERE id > ? ORDER BY id LIMIT 10', self._provider.statements[-1])
+
+    def test_pages_keep_filters(self):
+        """ Test pagination keeps the queryset filters """
+        self.insert_rulings(20)
+
+        queryset = self.model().objects.filter(Q('id', QOper.O_GT, 5))
+        ids = [r.id for page in queryset.paginate_by_key(page_size=4) for r in page]
+
+        self.assertEqual(ids, list(range(6, 21)))
+
+    def test_composite_key(self):
+        """ Test pages ordered by a composite (modified, id) key """
+        self.insert_rulings(6)
+        conn = sqlite3.connect(self._db_path)
+        conn.execute("UPDATE test_model SET modified = '2019-01-01 00:00:00' WHERE id IN (2, 5)")
+        conn.commit()
+        conn.close()
+
+        pages = list(self.model().objects.paginate_by_key(('modified', 'id'), page_size=2))
+
+        self.assertEqual([[r.id for r in page] for page in pages], [[2, 5], [1, 3], [4, 6]])
+        self.assertIn('WHERE modified > ? OR (modified = ? AND id > ?) ORDER BY modified, id LIMIT 2',
+                      self._provider.statements[-1])
+
+    def test_values_list_pages(self):
+        """ Test pagination of tuple results and a missing key column """
+        self.insert_rulings(5)
+
+        pages = list(self.model().objects.values_list('id', flat=True).paginate_by_key(page_size=2))
+        self.assertEqual([list(page) for page in pages], [[1, 2], [3, 4], [5]])
+
+        with self.assertRaises(ModelFieldRequired):
+            list(self.model().objects.values_list('subject').paginate_by_key(page_size=2))
@@ -0,0 +1,101 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import unittest
+
+from salty_orm.db.query import Q, QConn, QOper
+from salty_orm.db.sqlite3_provider import SqliteDBConnection
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestQOptimizer(unittest.TestCase):
+
+    _provider = None
+
+    def setUp(self) -> None:
+        self._provider = SqliteDBConnection(testing=True)
+        return super(TestQOptimizer, self).setUp()
+
+    def to_sql(self, *args, **kwargs):
+        return RulingModel(self._provider).objects.filter(*args, **kwargs).to_sql()
+
+    def test_or_equalities_fold_into_in(self):
+        """ Test OR'ed equalities on one field become an IN clause """
+        sql, args = self.to_sql(Q('id', QOper.O_EQUAL, 1) | Q('id', QOper.O_EQUAL, 2) |
+                                Q('id', QOper.O_IN, 2, 3))
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE id IN (?, ?, ?)')
+        self.assertEqual(args, [1, 2, 3])
+
+    def test_or_keeps_other_fields(self):
+        """ Test folding leaves clauses on other fields in place """
+        sql, args = self.to_sql(Q('id', QOper.O_EQUAL, 1) | Q('status', QOper.O_EQUAL, 5) |
+                                Q('id', QOper.O_EQUAL, 2))
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE id IN (?, ?) OR status = ?')
+        self.assertEqual(args, [1, 2, 5])
+
+    def test_ranges_merge_into_between(self):
+        """ Test an inclusive range on one field becomes a BETWEEN clause """
+        sql, args = self.to_sql(Q('id', QOper.O_GT_EQUAL, 5) & Q('status', QOper.O_EQUAL, 1) &
+                                Q('id', QOper.O_LT_EQUAL, 10))
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE id BETWEEN ? AND ? AND status = ?')
+        self.assertEqual(args, [5, 10, 1])
+
+    def test_duplicates_removed_and_ands_flattened(self):
+        """ Test repeated clauses are dropped and nested ANDs are flattened """
+        sql, args = RulingModel(self._provider).objects.filter(Q('status', QOper.O_EQUAL, 1)).\
+            filter(Q('id', QOper.O_GT, 3) & Q('status', QOper.O_EQUAL, 1)).to_sql()
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE status = ? AND id > ?')
+        self.assertEqual(args, [1, 3])
+
+    def test_nested_or_grouped(self):
+        """ Test an OR branch inside an AND branch keeps its parentheses """
+        sql, args = self.to_sql(Q('status', QOper.O_EQUAL, 1) &
+                                (Q('id', QOper.O_LT, 3) | Q('id', QOper.O_GT, 8)))
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE status = ? AND (id < ? OR id > ?)')
+        self.assertEqual(args, [1, 3, 8])
+
+    def test_is_null_has_no_argument(self):
+        """ Test an IS NULL clause does not bind an argument """
+        sql, args = self.to_sql(Q('subject', QOper.O_IS_NULL) & Q('id', QOper.O_EQUAL, 1))
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE subject IS NULL AND id = ?')
+        self.assertEqual(args, [1])
+
+    def test_combining_does_not_change_operands(self):
+        """ Test &, | and ~ return new Q objects and querysets do not share where clauses """
+        q1 = Q('id', QOper.O_EQUAL, 1)
+        q2 = Q('status', QOper.O_EQUAL, 2)
+
+        inverted = ~q1
+        combined = q1 & q2
+        self.assertFalse(q1.invert)
+        self.assertTrue(inverted.invert)
+        self.assertEqual(combined.connector, QConn.C_AND)
+        self.assertFalse(q1.is_branch())
+
+        base = RulingModel(self._provider).objects.filter(q1)
+        base.filter(q2).to_sql()
+        self.assertEqual(base.to_sql(), ('SELECT * FROM test_model WHERE id = ?', [1]))
+
+    def test_exclude_negates_all_arguments(self):
+        """ Test exclude() negates the ANDed keyword arguments together """
+        sql, args = RulingModel(self._provider).objects.exclude(id=1, status=2).to_sql()
+        self.assertEqual(sql, 'SELECT * FROM test_model WHERE NOT (id = ? AND status = ?)')
+        self.assertEqual(args, [1, 2])
+
+
+class TestQOptimizerResults(SqliteTestCase):
+
+    def test_optimized_results_match(self):
+        """ Test optimized where clauses return the same rows """
+        self.insert_rulings(10)
+
+        data = self.model().objects.filter(Q('id', QOper.O_EQUAL, 2) | Q('id', QOper.O_EQUAL, 4) |
+                                           Q('id', QOper.O_EQUAL, 4)).order_by('id')
+        self.assertEqual([r.id for r in data], [2, 4])
+
+        data = self.model().objects.filter(Q('id', QOper.O_GT_EQUAL, 3) & Q('id', QOper.O_LT_EQUAL, 5))
+        self.assertEqual(sorted(r.id for r in data), [3, 4, 5])
@@ -0,0 +1,39 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestQuerySetIndexing(SqliteTestCase):
+
+    def test_index_access(self):
+        """ Test index and slice access return the cached objects without more queries """
+        self.insert_rulings(10)
+
+        queryset = self.model().objects.all()
+        first = queryset[0]
+        executed = len(self._provider.statements)
+
+        for x in range(len(queryset)):
+            self.assertEqual(queryset[x].id, x + 1)
+        self.assertIs(queryset[0], first)
+        self.assertEqual(queryset[-1].id, 10)
+        self.assertEqual([r.id for r in queryset[2:5]], [3, 4, 5])
+        self.assertEqual([r.id for r in queryset[::-4]], [10, 6, 2])
+        self.assertEqual(len(self._provider.statements), executed)
+
+        with self.assertRaises(IndexError):
+            queryset[10]
+
+    def test_clone_is_independent(self):
+        """ Test a cloned result can be changed without changing the cached result """
+        self.insert_rulings(1)
+
+        queryset = self.model().objects.all()
+        copy = queryset[0].clone()
+        copy.status = 5
+        self.assertEqual(queryset[0].status, 1)
+        self.assertIsNot(copy.fields, queryset[0].fields)
@@ -0,0 +1,74 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import sqlite3
+
+from salty_orm.db.schema import schema_registry
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestSchemaFingerprint(SqliteTestCase):
+
+    def _alter_table(self):
+        conn = sqlite3.connect(self._db_path)
+        conn.execute('ALTER TABLE test_model ADD COLUMN notes text')
+        conn.commit()
+        conn.close()
+
+    def test_invalidate_on_schema_change(self):
+        """ Test a schema change drops the cached table columns """
+        invalidated = list()
+
+        def listener(identity, table):
+            invalidated.append(table)
+
+        schema_registry.add_listener(listener)
+        self.addCleanup(schema_registry.remove_listener, listener)
+
+        self.insert_rulings(2)
+        self.assertNotIn('notes', self.model().objects.get(id=1).fields)
+
+        self._alter_table()
+        self.assertEqual(schema_registry.check(self._provider, force=True), ['test_model'])
+        self.assertEqual(invalidated, ['test_model'])
+        self.assertIn('notes', RulingModel(self._provider).fields)
+
+    def test_check_is_throttled(self):
+        """ Test queries check the fingerprint at most once per check interval """
+        self.insert_rulings(2)
+        for x in range(5):
+            list(self.model().objects.all())
+            schema_registry.check(self._provider)
+
+        pragmas = [s for s in self._provider.statements if s == 'PRAGMA schema_version']
+        self.assertEqual(len(pragmas), 1)
+
+    def test_queries_invalidate_automatically(self):
+        """ Test a query notices a schema change once the check interval has passed """
+        self.insert_rulings(2)
+        self.assertNotIn('notes', self.model().objects.get(id=1).fields)
+        self._alter_table()
+
+        interval = schema_registry.check_interval
+        schema_registry.check_interval = 0
+        self.addCleanup(setattr, schema_registry, 'check_interval', interval)
+
+        self.assertIn('notes', self.model().objects.get(id=1).fields)
+        self.assertIn('notes', list(self.model().objects.iterator())[0].fields)
+
+    def test_warmed_schema_is_invalidated(self):
+        """ Test a table migrated after it was introspected, but before any query, is invalidated """
+        schema_registry.warm(self._provider, RulingModel)
+        self._alter_table()
+
+        self.assertEqual(schema_registry.check(self._provider, force=True), ['test_model'])
+        self.assertIn('notes', RulingModel(self._provider).fields)
+
+    def test_check_without_schemas(self):
+        """ Test check() does not query a database without introspected schemas """
+        self.assertEqual(schema_registry.check(self._provider, force=True), [])
+        self.assertIsNone(self._provider.statements)
@@ -0,0 +1,39 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.schema import schema_registry
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestSchemaRegistry(SqliteTestCase):
+
+    def _introspections(self):
+        return len([s for s in self._provider.statements or [] if s.startswith('PRAGMA table_info')])
+
+    def test_introspect_once(self):
+        """ Test table columns are only introspected once for many rows """
+        self.insert_rulings(25)
+
+        records = list(self.model().objects.all())
+        self.assertEqual(len(records), 25)
+        self.assertEqual(self._introspections(), 1)
+        self.assertEqual(records[0].fields[:3], ['id', 'created', 'modified'])
+
+    def test_warm_and_clear(self):
+        """ Test pre-warming and clearing the registry """
+        schema_registry.warm(self._provider, RulingModel)
+        self.assertEqual(self._introspections(), 1)
+        self.assertIn('status', schema_registry.get_columns(self._provider, 'test_model'))
+
+        RulingModel(self._provider)
+        self.assertEqual(self._introspections(), 1)
+
+        schema_registry.clear(self._provider, RulingModel)
+        self.assertEqual(len(schema_registry), 0)
+
+        RulingModel(self._provider)
+        self.assertEqual(self._introspections(), 2)
@@ -0,0 +1,77 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from salty_orm.db.query import DoesNotExist, MultipleObjectsReturned, Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestSingleRecord(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestSingleRecord, self).setUp()
+        self.insert_rulings(5)
+
+    def test_exists(self):
+        """ Test exists() selects a single constant row """
+        self.assertTrue(self.model().objects.filter(Q('id', QOper.O_GT, 4)).exists())
+        self.assertEqual(self._provider.statements[-1], 'SELECT 1 FROM test_model WHERE id > ? LIMIT 1')
+
+        self.assertFalse(self.model().objects.filter(Q('id', QOper.O_GT, 5)).exists())
+
+    def test_first_and_last(self):
+        """ Test first() and last() read one record ordered by id """
+        objects = self.model().objects
+
+        self.assertEqual(objects.first().id, 1)
+        self.assertEqual(self._provider.statements[-1], 'SELECT * FROM test_model ORDER BY id LIMIT 1')
+
+        self.assertEqual(objects.filter(Q('id', QOper.O_LT, 4)).last().id, 3)
+        self.assertEqual(self._provider.statements[-1],
+                         'SELECT * FROM test_model WHERE id < ? ORDER BY id DESC LIMIT 1')
+
+        self.assertEqual(objects.order_by('id DESC').last().id, 1)
+        self.assertIsNone(objects.filter(Q('id', QOper.O_GT, 5)).first())
+
+    def test_last_multi_column_order(self):
+        """ Test last() reverses every term of a multi column ordering """
+        self._provider.db_exec('UPDATE test_model SET status = 2 WHERE id IN (1, 2)')
+
+        self.assertEqual(self.model().objects.order_by('status DESC, id').last().id, 5)
+        self.assertEqual(self._provider.statements[-1],
+                         'SELECT * FROM test_model ORDER BY status, id DESC LIMIT 1')
+        self.assertEqual(self.model().objects.order_by('status', 'id DESC').last().id, 1)
+        self.assertEqual(self.model().objects.order_by('COALESCE(status, 0), id').last().id, 2)
+
+    def test_get_reads_two_records(self):
+        """ Test get() limits the query to two records """
+        self.assertEqual(self.model().objects.get(id=3).id, 3)
+        self.assertEqual(self._provider.statements[-1], 'SELECT * FROM test_model WHERE id = ? LIMIT 2')
+
+        with self.assertRaises(MultipleObjectsReturned):
+            self.model().objects.get(status=1)
+
+        with self.assertRaises(DoesNotExist):
+            self.model().objects.get(id=10)
+
+    def test_get_keyword_arguments_combined(self):
+        """ Test get() ANDs all keyword arguments """
+        with self.assertRaises(DoesNotExist):
+            self.model().objects.get(id=3, status=2)
+
+    def test_result_cache_reused(self):
+        """ Test populated querysets answer without running another query """
+        queryset = self.model().objects.filter(Q('id', QOper.O_LT, 3))
+        list(queryset)
+        count = len(self._provider.statements)
+
+        self.assertTrue(queryset.exists())
+        self.assertEqual(queryset.first().id, 1)
+        self.assertEqual(queryset.last().id, 2)
+        self.assertEqual(len(self._provider.statements), count)
+
+        # Filtering a populated queryset runs a new query.
+        self.assertEqual(queryset.get(id=2).id, 2)
+        self.assertEqual(len(self._provider.statements), count + 1)
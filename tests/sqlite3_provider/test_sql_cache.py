@@ -0,0 +1,59 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import unittest
+
+from salty_orm.db.query import CompiledSQLCache, Q, QOper, sql_cache
+from salty_orm.db.schema import schema_registry
+from salty_orm.db.sqlite3_provider import SqliteDBConnection
+from salty_orm.examples.models import RulingModel
+
+
+class TestCompiledSQLCache(unittest.TestCase):
+
+    _provider = None
+
+    def setUp(self) -> None:
+        self._provider = SqliteDBConnection(testing=True)
+        sql_cache.invalidate()
+        return super(TestCompiledSQLCache, self).setUp()
+
+    def test_same_shape_hits_cache(self):
+        """ Test queries that only differ in values share a compiled statement """
+        hits = sql_cache.hits
+
+        sql1, args1 = RulingModel(self._provider).objects.filter(Q('status', QOper.O_LT, 10)).limit(5).to_sql()
+        sql2, args2 = RulingModel(self._provider).objects.filter(Q('status', QOper.O_LT, 2)).limit(5).to_sql()
+
+        self.assertEqual(sql1, 'SELECT * FROM test_model WHERE status < ? LIMIT 5')
+        self.assertEqual(sql1, sql2)
+        self.assertEqual((args1, args2), ([10], [2]))
+        self.assertEqual(sql_cache.hits, hits + 1)
+        self.assertEqual(len(sql_cache), 1)
+
+    def test_different_shapes(self):
+        """ Test different query shapes are compiled separately """
+        sql1, _ = RulingModel(self._provider).objects.filter(Q('id', QOper.O_IN, 1, 2)).to_sql()
+        sql2, _ = RulingModel(self._provider).objects.filter(Q('id', QOper.O_IN, 1, 2, 3)).to_sql()
+
+        self.assertEqual(sql1, 'SELECT * FROM test_model WHERE id IN (?, ?)')
+        self.assertEqual(sql2, 'SELECT * FROM test_model WHERE id IN (?, ?, ?)')
+        self.assertEqual(len(sql_cache), 2)
+
+    def test_lru_and_invalidation(self):
+        """ Test the cache size limit and invalidation on schema changes """
+        cache = CompiledSQLCache(maxsize=2)
+        cache.put(('a', 1), 'SELECT 1')
+        cache.put(('b', 1), 'SELECT 2')
+        cache.get(('a', 1))
+        cache.put(('c', 1), 'SELECT 3')
+        self.assertIsNone(cache.get(('b', 1)))
+        self.assertEqual(cache.stats()['hits'], 1)
+
+        RulingModel(self._provider).objects.to_sql()
+        self.assertEqual(len(sql_cache), 1)
+        schema_registry.invalidate(self._provider, 'test_model')
+        self.assertEqual(len(sql_cache), 0)
@@ -0,0 +1,75 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import unittest
+
+from salty_orm.db.base_provider import StatementCache
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestStatementCache(unittest.TestCase):
+
+    def test_hit_rate(self):
+        """ Test repeated statements are counted as cache hits """
+        cache = StatementCache(2)
+
+        self.assertEqual(cache.prepare('SELECT 1'), 'SELECT 1')
+        self.assertEqual(cache.prepare('SELECT 1'), 'SELECT 1')
+        self.assertEqual(cache.prepare('SELECT 2'), 'SELECT 2')
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (1, 2, 2))
+        self.assertAlmostEqual(stats['hit_rate'], 1 / 3)
+
+    def test_evicts_least_recently_used(self):
+        """ Test the cache drops the least recently used statement when full """
+        cache = StatementCache(2)
+        cache.prepare('SELECT 1')
+        cache.prepare('SELECT 2')
+        cache.prepare('SELECT 1')
+        cache.prepare('SELECT 3')
+
+        cache.prepare('SELECT 1')
+        self.assertEqual(cache.hits, 2)
+        cache.prepare('SELECT 2')
+        self.assertEqual(cache.misses, 4)
+
+
+class TestStatementReuse(SqliteTestCase):
+
+    def test_repeated_query_reuses_statement_and_cursor(self):
+        """ Test running the same query shape reuses the prepared statement and the cursor """
+        self.insert_rulings(5)
+        model = self.model()
+
+        model.objects.filter(Q('id', QOper.O_EQUAL, 1)).count()
+        cursor = self._provider._cursor
+        before = self._provider.db_statement_stats()
+
+        for pk in range(2, 6):
+            data = list(self.model().objects.filter(Q('id', QOper.O_EQUAL, pk)))
+            self.assertEqual(data[0].id, pk)
+
+        after = self._provider.db_statement_stats()
+        self.assertGreaterEqual(after['hits'] - before['hits'], 3)
+        self.assertIs(self._provider._cursor, cursor)
+
+    def test_iterator_uses_own_cursor(self):
+        """ Test streaming a result does not disturb statements run on the shared cursor """
+        self.insert_rulings(5)
+
+        rows = self.model().objects.iterator(chunk_size=2)
+        first = next(rows)
+        self.assertEqual(len(list(self.model().objects.filter(Q('id', QOper.O_EQUAL, 3)))), 1)
+        self.assertEqual([first.id] + [r.id for r in rows], [1, 2, 3, 4, 5])
+
+    def test_close_releases_cursor(self):
+        """ Test closing the connection drops the shared cursor """
+        self._provider.db_exec_stmt('SELECT 1')
+        self.assertIsNotNone(self._provider._cursor)
+        self._provider.db_close()
+        self.assertIsNone(self._provider._cursor)
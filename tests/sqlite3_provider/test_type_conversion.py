@@ -0,0 +1,48 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import sqlite3
+from datetime import datetime, date
+
+from salty_orm.db.schema import schema_registry, to_datetime, to_date
+from salty_orm.examples.models import RulingModel
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestTypeConversion(SqliteTestCase):
+
+    def test_converters_from_declared_types(self):
+        """ Test converters are only built for datetime columns """
+        schema = schema_registry.get_schema(self._provider, RulingModel)
+        self.assertEqual(sorted(schema.converters), ['created', 'modified', 'ruling_dt'])
+
+    def test_datetime_values(self):
+        """ Test datetime columns are converted when rows are built """
+        self.insert_rulings(1)
+        record = self.model().objects.get(id=1)
+        self.assertEqual(record.created, datetime(2019, 1, 2, 3, 4, 5))
+        self.assertEqual(record.ruling_no, 'R00001')
+
+        values = self.model().objects.values('modified').get(id=1)
+        self.assertEqual(values['modified'], datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_raw_statements_not_converted(self):
+        """ Test the sqlite driver converters are left alone, raw statements return the stored values """
+        self.insert_rulings(1)
+
+        data = self._provider.db_exec_stmt('SELECT created FROM test_model WHERE id = 1')
+        self.assertEqual(data[0]['created'], '2019-01-02 03:04:05')
+        self.assertNotIn('DATETIME', sqlite3.converters)
+
+    def test_convert_functions(self):
+        """ Test the converter fast paths and fallbacks """
+        ts = datetime(2019, 1, 2, 3, 4, 5)
+        self.assertIs(to_datetime(ts), ts)
+        self.assertEqual(to_datetime(b'2019-01-02T03:04:05'), ts)
+        self.assertEqual(to_datetime('Jan 2 2019 03:04:05'), ts)
+        self.assertEqual(to_datetime('not a date'), 'not a date')
+        self.assertEqual(to_date('2019-01-02'), date(2019, 1, 2))
+        self.assertIsNone(to_date(None))
@@ -0,0 +1,54 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+import datetime
+
+from salty_orm.db.query import Q, QOper
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestUpdate(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestUpdate, self).setUp()
+        self.insert_rulings(10)
+
+    def test_update_filtered(self):
+        """ Test update() changes the filtered rows with one statement and sets modified """
+        queried = len(self._provider.statements or list())
+
+        changed = self.model().objects.filter(Q('id', QOper.O_GT, 6)).update(status=10, subject=['a', 'b'])
+
+        self.assertEqual(changed, 4)
+        self.assertFalse([stmt for stmt in self._provider.statements[queried:] if stmt.startswith('SELECT')])
+
+        data = list(self.model().objects.order_by('id'))
+        self.assertEqual([r.status for r in data], [1] * 6 + [10] * 4)
+        self.assertEqual(data[9].subject, 'a,b')
+        self.assertEqual(data[0].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
+        self.assertGreater(data[9].modified, datetime.datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_update_all_and_large_in(self):
+        """ Test update() without a filter and with a large IN clause """
+        self.assertEqual(self.model().objects.update(status=3), 10)
+        self.assertEqual(self.model().objects.filter(status=3).count(), 10)
+
+        self._provider.max_in_values = 2
+        changed = self.model().objects.filter(Q('id', QOper.O_IN, 1, 2, 3)).update(status=4)
+        self.assertEqual(changed, 3)
+        self.assertEqual(self.model().objects.filter(status=4).count(), 3)
+
+    def test_update_validation(self):
+        """ Test update() argument checks """
+        with self.assertRaises(ValueError):
+            self.model().objects.update()
+        with self.assertRaises(ValueError):
+            self.model().objects.update(id=5)
+        with self.assertRaises(ValueError):
+            self.model().objects.update(no_such_column=5)
+        with self.assertRaises(ValueError):
+            self.model().objects.limit(2).update(status=5)
+        self.assertEqual(self.model().objects.filter(status=1).count(), 10)
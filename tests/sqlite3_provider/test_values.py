@@ -0,0 +1,43 @@
+#
+# This file is subject to the terms and conditions defined in the
+# file 'LICENSE', which is part of this source code package.
+#
+# Copyright (c) 2019 Robert Abram - All Rights Reserved.
+#
+from datetime import datetime
+
+from tests.sqlite3_provider.helpers import SqliteTestCase
+
+
+class TestValues(SqliteTestCase):
+
+    def setUp(self) -> None:
+        super(TestValues, self).setUp()
+        self.insert_rulings(3)
+
+    def test_values(self):
+        """ Test values() returns dicts """
+        rows = list(self.model().objects.values('id', 'ruling_no').order_by('id'))
+        self.assertEqual(rows[0], {'id': 1, 'ruling_no': 'R00001'})
+
+        row = self.model().objects.values().get(id=2)
+        self.assertEqual(row['created'], datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_values_list(self):
+        """ Test values_list() returns tuples, flat values or named tuples """
+        rows = list(self.model().objects.values_list('id', 'status'))
+        self.assertEqual(rows, [(1, 1), (2, 1), (3, 1)])
+
+        ids = list(self.model().objects.values_list('id', flat=True))
+        self.assertEqual(ids, [1, 2, 3])
+
+        row = self.model().objects.values_list('id', 'modified', named=True).get(id=3)
+        self.assertEqual(row.id, 3)
+        self.assertEqual(row.modified, datetime(2019, 1, 2, 3, 4, 5))
+
+    def test_values_list_arguments(self):
+        """ Test invalid values_list() arguments """
+        with self.assertRaises(TypeError):
+            self.model().objects.values_list('id', 'status', flat=True)
+        with self.assertRaises(TypeError):
+            self.model().objects.values_list('id', flat=True, named=True)